@@ -0,0 +1,78 @@
+"""Micro-benchmark: per-run crew construction cost, fresh MiningAgents vs the CrewFactory pool.
+
+No LLM is called; this only measures what a request pays before kickoff.
+
+    python benchmarks/crew_construction.py --runs 200 --threads 4
+"""
+import argparse
+import gc
+import logging
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from mining_agents.crew import MiningAgents
+from mining_agents.factory import CrewFactory
+
+
+def fresh_crew() -> None:
+    # What every request did before the factory
+    MiningAgents(output_base_dir=None).crew()
+
+
+def pooled_crew(factory: CrewFactory) -> Callable[[], None]:
+    def run() -> None:
+        with factory.acquire() as mining_agents:
+            mining_agents.crew()
+    return run
+
+
+def measure(name: str, fn: Callable[[], None], runs: int, threads: int) -> None:
+    fn()  # warm-up
+
+    def timed(_) -> float:
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        durations: List[float] = list(executor.map(timed, range(runs)))
+    elapsed = time.perf_counter() - started
+
+    # Memory is traced in a separate pass, tracemalloc would skew the timings
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(runs):
+        fn()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    durations.sort()
+    print(
+        f"{name:<8} mean {statistics.mean(durations) * 1e3:8.3f} ms  "
+        f"p95 {durations[int(len(durations) * 0.95) - 1] * 1e3:8.3f} ms  "
+        f"throughput {runs / elapsed:9.1f} runs/s  "
+        f"retained {(after - before) / runs / 1024:7.1f} KiB/run"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    factory = CrewFactory(pool_size=args.threads, output_base_dir=None)
+    factory.warm()
+    print(f"{args.runs} runs on {args.threads} thread(s)")
+    measure("fresh", fresh_crew, args.runs, args.threads)
+    measure("pooled", pooled_crew(factory), args.runs, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Knowledge retrieval cost as the knowledge base grows, against stuffing it into the prompt.
+
+Writes ``--documents`` synthetic reference documents of ``--words`` words each, with a
+Zipf-distributed vocabulary like real prose, for every size in ``--scale``. Each is
+indexed once, reopened from disk as a fresh process would and searched with
+``--queries`` task-like queries. Reports build time, index size, open time, query
+latency, the prompt tokens of the top-k excerpts next to those of the whole knowledge
+base, and peak resident memory, which the build dominates.
+
+    python benchmarks/knowledge_index.py --scale 1 10 100
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+from typing import List
+
+
+def write_corpus(directory: str, documents: int, words: int, vocabulary: List[str], rng: random.Random) -> int:
+    """Write the documents in paragraphs and return their total size in characters"""
+    weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+    total = 0
+    for number in range(documents):
+        text = rng.choices(vocabulary, weights=weights, k=words)
+        paragraphs = [" ".join(text[start:start + 120]) for start in range(0, words, 120)]
+        content = "\n\n".join(paragraphs)
+        with open(os.path.join(directory, f"reference_{number:05d}.md"), "w") as f:
+            f.write(content)
+        total += len(content)
+    return total
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100, help="documents per unit of scale")
+    parser.add_argument("--words", type=int, default=1000, help="words per document")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 50], help="knowledge base sizes, in units of --documents")
+    parser.add_argument("--queries", type=int, default=200, help="searches per size")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="distinct words in the corpus")
+    args = parser.parse_args()
+
+    from mining_agents.knowledge import CHARS_PER_TOKEN, KnowledgeIndex
+
+    rng = random.Random(7)
+    vocabulary = [f"term{index}" for index in range(args.vocabulary)]
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as workspace:
+            corpus, index_path = os.path.join(workspace, "knowledge"), os.path.join(workspace, "index")
+            os.makedirs(corpus)
+            characters = write_corpus(corpus, args.documents * scale, args.words, vocabulary, rng)
+
+            started = time.perf_counter()
+            KnowledgeIndex.build(corpus, index_path).close()
+            build_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            index = KnowledgeIndex(index_path)
+            open_seconds = time.perf_counter() - started
+
+            latencies: List[float] = []
+            excerpt_tokens: List[int] = []
+            for _ in range(args.queries):
+                # Task descriptions mix common words with a few specific ones
+                query = " ".join(rng.choices(vocabulary[:200], k=30) + rng.choices(vocabulary[200:], k=5))
+                started = time.perf_counter()
+                snippets = index.search(query)
+                latencies.append(time.perf_counter() - started)
+                excerpt_tokens.append(sum(len(snippet.text) for snippet in snippets) // CHARS_PER_TOKEN)
+            latencies.sort()
+            index.close()
+            print(
+                f"{args.documents * scale:6d} docs {index.chunks:7d} chunks | build {build_seconds:7.2f}s  "
+                f"index {directory_size(index_path) / 2 ** 20:7.1f} MiB  open {open_seconds * 1e3:6.1f} ms | "
+                f"search p50 {statistics.median(latencies) * 1e3:6.2f} ms  p95 {latencies[int(len(latencies) * 0.95) - 1] * 1e3:6.2f} ms | "
+                f"prompt tokens {statistics.mean(excerpt_tokens):5.0f} vs {characters // CHARS_PER_TOKEN:10d} stuffed | "
+                # ru_maxrss is in KiB on Linux
+                f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
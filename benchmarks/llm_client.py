@@ -0,0 +1,120 @@
+"""Per-call LLM latency with LiteLLM's default clients vs the shared keep-alive pool.
+
+A local OpenAI-compatible stub server answers every chat completion after ``--latency``
+seconds and charges ``--handshake`` seconds for each new connection, standing in for
+the TCP and TLS setup to a real provider. Calls come in rounds of ``--calls`` at
+``--concurrency``, with ``--idle`` seconds between rounds, like agents thinking between
+turns. The default idle time outlasts httpx's 5 second keep-alive, so the default
+clients reconnect every round while the shared pool keeps its connections.
+
+    python benchmarks/llm_client.py --rounds 4 --calls 20 --concurrency 5
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+COMPLETION = {
+    "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "stub",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+}
+
+
+def stub_server(latency: float, handshake: float) -> ThreadingHTTPServer:
+    """OpenAI-compatible server on a free local port, counting the connections it accepts"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            with server.lock:
+                server.connections += 1
+            time.sleep(handshake)
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps(COMPLETION).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(name: str, server: ThreadingHTTPServer, call: Callable[[], None], args: argparse.Namespace) -> Dict[str, float]:
+    def timed(_) -> float:
+        started = time.perf_counter()
+        call()
+        return time.perf_counter() - started
+
+    call()  # warm-up, so one-off setup inside LiteLLM is not counted
+    server.connections = 0
+    durations: List[float] = []
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for round_number in range(args.rounds):
+            if round_number:
+                time.sleep(args.idle)
+            durations.extend(executor.map(timed, range(args.calls)))
+    durations.sort()
+    print(
+        f"{name:<16} mean {statistics.mean(durations) * 1e3:7.1f} ms  "
+        f"p95 {durations[int(len(durations) * 0.95) - 1] * 1e3:7.1f} ms  "
+        f"connections opened {server.connections:4d}"
+    )
+    return {"mean": statistics.mean(durations)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=20, help="LLM calls per round")
+    parser.add_argument("--concurrency", type=int, default=5, help="calls in flight at once, e.g. agents across crews")
+    parser.add_argument("--idle", type=float, default=6.0, help="seconds between rounds")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the stub takes to answer")
+    parser.add_argument("--handshake", type=float, default=0.05, help="seconds charged per new connection")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+    import litellm
+    from crewai import LLM
+    from mining_agents.llm_client import close_shared_client, install_shared_client
+
+    server = stub_server(args.latency, args.handshake)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    def call() -> None:
+        # A new LLM per call, as every agent of every crew has its own
+        LLM(model="openai/stub", base_url=base_url, api_key="stub", max_retries=0).call("Summarize the project.")
+
+    litellm.client_session = None
+    litellm.in_memory_llm_clients_cache.flush_cache()
+    default = measure("litellm default", server, call, args)
+    install_shared_client()
+    shared = measure("shared pool", server, call, args)
+    close_shared_client()
+    server.shutdown()
+    print(f"shared pool saves {(default['mean'] - shared['mean']) * 1e3:.1f} ms per call")
+
+
+if __name__ == "__main__":
+    main()
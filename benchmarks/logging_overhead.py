@@ -0,0 +1,95 @@
+"""Per-run cost of logging and verbose agent tracing, development vs production profile.
+
+Each profile runs in its own process, since logging is configured once per process, with
+StubLLM answering instantly so only the crew's own overhead is timed. The process's
+stdout and stderr go to a file, as they would to a container log driver, and app.log is
+written next to it. Reports time per run and the console and log file bytes each run
+writes.
+
+    python benchmarks/logging_overhead.py --runs 50
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+PROFILES = ("development", "production")
+
+
+def child(args: argparse.Namespace) -> None:
+    from stub_llm import install
+    install(0.0, args.output_size)
+    from mining_agents.factory import CrewFactory
+
+    factory = CrewFactory(pool_size=1, output_base_dir=None)
+    durations = []
+    # The first run also builds the crew and is not counted
+    for index in range(args.runs + 1):
+        inputs = {"project_name": f"Logging Benchmark {index}", "location_region": "Skeena",
+                  "cobalt_type": "Sediment-Hosted Stratiform", "scale": "Large"}
+        started = time.perf_counter()
+        with factory.acquire() as mining_agents:
+            mining_agents.crew().kickoff(inputs=inputs)
+        durations.append(time.perf_counter() - started)
+    with open(args.result, "w") as f:
+        json.dump(durations[1:], f)
+
+
+def run_profile(profile: str, args: argparse.Namespace, directory: str) -> Dict[str, float]:
+    console_path = os.path.join(directory, f"{profile}.console")
+    log_path = os.path.join(directory, f"{profile}.log")
+    result_path = os.path.join(directory, f"{profile}.json")
+    env = os.environ | {
+        "EA_LOG_PROFILE": profile,
+        "EA_LOG_FILE": log_path,
+        "EA_CACHE_ENABLED": "false",
+        "EA_TASK_CACHE_ENABLED": "false",
+        "EA_CHECKPOINTS_ENABLED": "false",
+        "OTEL_SDK_DISABLED": "true",
+    }
+    command = [sys.executable, __file__, "--child", "--result", result_path,
+               "--runs", str(args.runs), "--output-size", str(args.output_size)]
+    with open(console_path, "w") as console:
+        subprocess.run(command, env=env, stdout=console, stderr=subprocess.STDOUT, check=True)
+    with open(result_path) as f:
+        durations = json.load(f)
+    # Rotated backups count too
+    log_bytes = sum(os.path.getsize(path) for path in glob.glob(log_path + "*"))
+    return {
+        "mean": statistics.mean(durations),
+        "p50": statistics.median(durations),
+        "console": os.path.getsize(console_path) / args.runs,
+        "log": log_bytes / args.runs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50, help="crew runs per profile")
+    parser.add_argument("--output-size", type=int, default=2000, help="characters of free text in each stub answer")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {profile: run_profile(profile, args, directory) for profile in PROFILES}
+    for profile, stats in results.items():
+        print(
+            f"{profile:<12} mean {stats['mean'] * 1e3:8.2f} ms/run  p50 {stats['p50'] * 1e3:8.2f} ms/run  "
+            f"console {stats['console'] / 1024:8.1f} KiB/run  app.log {stats['log'] / 1024:8.1f} KiB/run"
+        )
+    saved = results["development"]["mean"] - results["production"]["mean"]
+    print(f"production saves {saved * 1e3:.2f} ms per run ({saved / results['development']['mean']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Fuzz and scaling check for mining_agents.parsing against the regexes it replaced.
+
+Random markdown is parsed by both implementations and the results must match. Then
+inputs from 16 KiB up to several MiB are timed: the tokenizer grows linearly with input
+size, the old lazy DOTALL patterns do not.
+
+    python benchmarks/parser_scaling.py --fuzz 2000 --max-size 4
+"""
+import argparse
+import logging
+import random
+import re
+import time
+from typing import Callable, Dict, List
+
+from mining_agents.parsing import clean_markdown, parse_next_steps, parse_pd_outline
+
+
+def legacy_pd_outline(pd_content: str) -> Dict[str, str]:
+    matches = re.findall(r'\*\*(.*?)\*\*(.*?)(?=\*\*.*?\*\*|\Z)', pd_content, re.DOTALL)
+    if matches:
+        return {name.strip(): content.strip() for name, content in matches}
+    sections, current_section, content_lines = {}, None, []
+    for line in pd_content.split('\n'):
+        if line.startswith('**'):
+            if current_section and content_lines:
+                sections[current_section] = '\n'.join(content_lines)
+                content_lines = []
+            current_section = line.strip('*').strip()
+        elif line.strip() and current_section:
+            content_lines.append(line)
+    if current_section and content_lines:
+        sections[current_section] = '\n'.join(content_lines)
+    return sections
+
+
+def legacy_next_steps(next_steps_content: str) -> List[Dict[str, str]]:
+    next_steps = []
+    for _, match in re.findall(r'(\d+\.)\s+(.*?)(?=\d+\.\s+|\Z)', next_steps_content, re.DOTALL):
+        lines = [line.strip() for line in match.strip().split('\n')]
+        next_steps.append({"step": lines[0], "explanation": ' '.join(lines[1:]) if len(lines) > 1 else ""})
+    if next_steps:
+        return next_steps
+    current_step, explanation_lines = None, []
+    for line in next_steps_content.split('\n'):
+        if line.strip():
+            if line.startswith('1.') or line.startswith('2.') or line.startswith('3.'):
+                if current_step and explanation_lines:
+                    next_steps.append({"step": current_step, "explanation": ' '.join(explanation_lines)})
+                    explanation_lines = []
+                parts = line.split('.', 1)
+                current_step = parts[1].strip() if len(parts) > 1 else line.strip()
+            elif current_step:
+                explanation_lines.append(line.strip())
+    if current_step and explanation_lines:
+        next_steps.append({"step": current_step, "explanation": ' '.join(explanation_lines)})
+    return next_steps
+
+
+def legacy_clean_markdown(content: str) -> str:
+    return content.replace('\n\n', '\n').replace('*   ', '* ')
+
+
+FRAGMENTS = ['**', '*', '***', '*   ', '1. ', '2.', '12. ', '3.\n', '9', '.', ' ', '\n', '\n\n',
+             'Overview', 'Water', 'step text', '- item', ':', '1.5 ha', '2024.']
+
+
+def fuzz(rounds: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for round_number in range(rounds):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60)))
+        for new, old in ((parse_pd_outline, legacy_pd_outline), (parse_next_steps, legacy_next_steps),
+                         (clean_markdown, legacy_clean_markdown)):
+            if new(text) != old(text):
+                raise AssertionError(f"{new.__name__} differs from the legacy parser on {text!r} (round {round_number})")
+    print(f"fuzz: {rounds} random documents parsed identically")
+
+
+def llm_like(size: int) -> str:
+    """Realistic model output: bold headers, bullets and numbered steps"""
+    block = ("**Project Overview**\n*   Proponent: Example Cobalt Corp.\n*   Location: Skeena region, 2.5 km north\n\n"
+             "1. Engage early with the EAO\nSubmit the initial project description.\n\n")
+    return (block * (size // len(block) + 1))[:size]
+
+
+def adversarial(size: int) -> str:
+    """A long digit run, e.g. a table of figures: the old step lookahead rescans it at every digit"""
+    return "**Overview**\n1. Inventory\n" + "9" * size
+
+
+def timed(fn: Callable[[str], object], text: str) -> float:
+    started = time.perf_counter()
+    fn(text)
+    return time.perf_counter() - started
+
+
+def scaling(max_size_mib: int, legacy_limit_kib: int) -> None:
+    sizes = [16 * 1024]
+    while sizes[-1] < max_size_mib * 1024 * 1024:
+        sizes.append(sizes[-1] * 2)
+    # The legacy step pattern is quadratic on digit runs, so it only gets small inputs there
+    for name, generate, legacy_limit in (("llm-like", llm_like, legacy_limit_kib), ("adversarial", adversarial, 64)):
+        print(f"\n{name} input")
+        print(f"{'size':>10} {'pd_outline':>12} {'next_steps':>12} {'legacy pd':>12} {'legacy steps':>13}")
+        for size in sizes:
+            text = generate(size)
+            row = f"{size // 1024:>7} KiB {timed(parse_pd_outline, text) * 1e3:>9.1f} ms {timed(parse_next_steps, text) * 1e3:>9.1f} ms"
+            if size <= legacy_limit * 1024:
+                row += f" {timed(legacy_pd_outline, text) * 1e3:>9.1f} ms {timed(legacy_next_steps, text) * 1e3:>10.1f} ms"
+            else:
+                row += f" {'skipped':>12} {'skipped':>13}"
+            print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fuzz", type=int, default=2000, help="random documents to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-size", type=int, default=4, help="largest input in MiB")
+    parser.add_argument("--legacy-limit", type=int, default=512, help="largest input in KiB given to the legacy regexes")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    fuzz(args.fuzz, args.seed)
+    scaling(args.max_size, args.legacy_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Offline load test of the full scoping pipeline, with a stub LLM instead of a provider.
+
+Drives the ``batch`` CLI path and the FastAPI app (through an in-process ASGI client)
+with distinct projects at a fixed concurrency. Every LLM call is answered by StubLLM
+after ``--latency`` seconds, so results are repeatable and no network or API key is
+needed. ``--fan-in`` sends every API request that many times at once, as a dashboard
+does on double clicks. Reports p50/p95/p99 latency, requests per second, LLM calls per
+request and peak RSS; ``--max-p95`` and ``--min-rps`` turn it into a pass/fail
+regression gate.
+
+    python benchmarks/pipeline.py --mode both --requests 40 --concurrency 8 --latency 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REGIONS = ("Skeena", "Kootenay", "Cariboo", "Omineca")
+SCALES = ("Small", "Medium", "Large")
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Size the worker pool for the load and keep caches from answering repeated runs"""
+    os.environ["EA_MAX_WORKERS"] = str(args.concurrency)
+    os.environ["EA_MAX_QUEUE"] = str(args.requests)
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    # Benchmark runs are never resumed
+    os.environ["EA_CHECKPOINTS_ENABLED"] = "false"
+    # Measure served requests, not the crew pool still being built in the background
+    os.environ["EA_CREW_WARMUP"] = "blocking"
+    if not args.cache:
+        os.environ["EA_CACHE_ENABLED"] = "false"
+        os.environ["EA_TASK_CACHE_ENABLED"] = "false"
+
+
+def projects(count: int) -> List[Dict[str, str]]:
+    return [
+        {
+            "project_name": f"Benchmark Project {index}",
+            "location_region": REGIONS[index % len(REGIONS)],
+            "cobalt_type": "Sediment-Hosted Stratiform",
+            "scale": SCALES[index % len(SCALES)],
+        }
+        for index in range(count)
+    ]
+
+
+def percentile(durations: List[float], share: float) -> float:
+    """Nearest-rank percentile of sorted durations"""
+    return durations[max(0, min(len(durations) - 1, round(share * len(durations)) - 1))]
+
+
+def report(mode: str, durations: List[float], failures: int, elapsed: float, llm_calls: int) -> Dict[str, float]:
+    durations = sorted(durations)
+    completed = len(durations)
+    stats = {
+        "p50": percentile(durations, 0.50) if durations else 0.0,
+        "p95": percentile(durations, 0.95) if durations else 0.0,
+        "p99": percentile(durations, 0.99) if durations else 0.0,
+        "rps": completed / elapsed if elapsed else 0.0,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    print(
+        f"{mode:<4} {completed} ok, {failures} failed in {elapsed:.2f}s | "
+        f"p50 {stats['p50'] * 1e3:8.1f} ms  p95 {stats['p95'] * 1e3:8.1f} ms  p99 {stats['p99'] * 1e3:8.1f} ms | "
+        f"{stats['rps']:7.2f} req/s | {llm_calls / max(completed + failures, 1):5.1f} LLM calls/req | "
+        f"peak RSS {stats['peak_rss_mib']:7.1f} MiB",
+        file=sys.stderr,
+    )
+    return stats
+
+
+def run_cli(args: argparse.Namespace) -> Dict[str, float]:
+    """Scope the projects with ``mining_agents batch``, reading per-project durations from its output"""
+    from mining_agents.main import batch
+    from stub_llm import StubLLM
+
+    with tempfile.TemporaryDirectory() as directory:
+        projects_path, results_path = os.path.join(directory, "projects.jsonl"), os.path.join(directory, "results.jsonl")
+        with open(projects_path, "w") as f:
+            f.writelines(json.dumps(project) + "\n" for project in projects(args.requests))
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            batch([projects_path, "--concurrency", str(args.concurrency), "--no-cache", "--output", results_path])
+        elapsed = time.perf_counter() - started
+        with open(results_path) as f:
+            results = [json.loads(line) for line in f if line.strip()]
+    durations = [result["duration"] for result in results if result["status"] == "completed"]
+    return report("cli", durations, len(results) - len(durations), elapsed, StubLLM.calls)
+
+
+async def _drive_api(args: argparse.Namespace) -> Dict[str, float]:
+    import httpx
+    from mining_agents import api
+    from stub_llm import StubLLM
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    durations: List[float] = []
+    failures = 0
+
+    async def scope(client: httpx.AsyncClient, project: Dict[str, str]) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/run-ea-scoping", params={"bypass_cache": "true"}, json=project)
+            if response.status_code == 200:
+                durations.append(time.perf_counter() - started)
+            else:
+                failures += 1
+
+    # ASGITransport does not run the lifespan, which warms the crew pool
+    async with api.lifespan(api.app):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            started = time.perf_counter()
+            # Repeated requests for a project arrive together, like double clicks and several viewers
+            requests = [project for project in projects(args.requests) for _ in range(args.fan_in)]
+            await asyncio.gather(*(scope(client, project) for project in requests))
+            elapsed = time.perf_counter() - started
+    return report("api", durations, failures, elapsed, StubLLM.calls)
+
+
+def run_api(args: argparse.Namespace) -> Dict[str, float]:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return asyncio.run(_drive_api(args))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("cli", "api", "both"), default="both")
+    parser.add_argument("--requests", type=int, default=20, help="distinct projects to scope")
+    parser.add_argument("--concurrency", type=int, default=4, help="projects scoped at the same time")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each stub LLM call takes")
+    parser.add_argument("--output-size", type=int, default=800, help="characters of free text in each stub answer")
+    parser.add_argument("--fan-in", type=int, default=1, help="identical API requests sent at once per project")
+    parser.add_argument("--cache", action="store_true", help="keep the result and task caches enabled")
+    parser.add_argument("--max-p95", type=float, help="fail when p95 latency in seconds exceeds this")
+    parser.add_argument("--min-rps", type=float, help="fail when throughput in requests/s is below this")
+    args = parser.parse_args()
+
+    if args.mode == "both":
+        # One process per mode so each reports its own peak RSS
+        codes = [subprocess.call([sys.executable, __file__, *sys.argv[1:], "--mode", mode]) for mode in ("cli", "api")]
+        sys.exit(max(codes))
+
+    configure_environment(args)
+    logging.disable(logging.WARNING)
+    from stub_llm import install
+    install(args.latency, args.output_size)
+    stats = run_cli(args) if args.mode == "cli" else run_api(args)
+
+    failed = []
+    if args.max_p95 is not None and stats["p95"] > args.max_p95:
+        failed.append(f"p95 {stats['p95']:.3f}s > {args.max_p95}s")
+    if args.min_rps is not None and stats["rps"] < args.min_rps:
+        failed.append(f"{stats['rps']:.2f} req/s < {args.min_rps} req/s")
+    if failed:
+        print(f"{args.mode}: regression gate failed: {'; '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
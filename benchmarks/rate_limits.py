@@ -0,0 +1,170 @@
+"""Crew runs under a provider rate limit, without and with the LLM rate limiter.
+
+A local OpenAI-compatible stub server allows ``--server-rpm`` chat completions per
+minute, counted over a sliding ``--window``, and answers every request beyond that
+with a 429 and a Retry-After header. Content comes from StubLLM, so the crews parse
+it as they would a real model's. ``--runs`` crews start together at ``--concurrency``,
+each in its own process per scenario:
+
+* ``off``: no limiter and no task retries, only the provider SDK's own retries
+* ``reactive``: limiter without a configured quota, pausing and slowing down on 429s
+* ``budgeted``: limiter with ``EA_LLM_REQUESTS_PER_MINUTE`` just under the server's quota
+
+Reports completed and failed runs, 429s served and the wall time.
+
+    python benchmarks/rate_limits.py --runs 8 --concurrency 8 --server-rpm 120
+"""
+import argparse
+import collections
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+SCENARIOS = {
+    "off": {"EA_LLM_RATE_LIMIT_ENABLED": "false", "EA_LLM_RATE_LIMIT_RETRIES": "0"},
+    "reactive": {"EA_LLM_RATE_LIMIT_ENABLED": "true", "EA_LLM_REQUESTS_PER_MINUTE": "0"},
+    "budgeted": {"EA_LLM_RATE_LIMIT_ENABLED": "true"},
+}
+
+
+def stub_server(rpm: float, window: float, latency: float, output_size: int) -> ThreadingHTTPServer:
+    """OpenAI-compatible server on a free local port that enforces ``rpm`` over ``window`` seconds"""
+    from stub_llm import StubLLM
+
+    stub = StubLLM(latency=0.0, output_size=output_size)
+    allowed = max(1, int(rpm * window / 60))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            now = time.monotonic()
+            with server.lock:
+                while server.accepted and server.accepted[0] <= now - window:
+                    server.accepted.popleft()
+                limited = len(server.accepted) >= allowed
+                if limited:
+                    server.rejected += 1
+                    wait = server.accepted[0] + window - now
+                else:
+                    server.accepted.append(now)
+            if limited:
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                           {"Retry-After": str(max(1, round(wait)))})
+                return
+            time.sleep(latency)
+            prompt = "\n".join(str(message.get("content", "")) for message in request["messages"])
+            answer = stub.answer(prompt)
+            self._send(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "stub",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": answer}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(answer) // 4,
+                          "total_tokens": (len(prompt) + len(answer)) // 4},
+            })
+
+        def _send(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.accepted = collections.deque()
+    server.rejected = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def child(args: argparse.Namespace) -> None:
+    logging.disable(logging.CRITICAL)
+    from mining_agents.factory import CrewFactory
+
+    factory = CrewFactory(pool_size=args.concurrency, output_base_dir=None)
+
+    def run(index: int) -> bool:
+        inputs = {"project_name": f"Rate Limit Benchmark {index}", "location_region": "Skeena",
+                  "cobalt_type": "Sediment-Hosted Stratiform", "scale": "Large"}
+        try:
+            with factory.acquire() as mining_agents:
+                mining_agents.crew().kickoff(inputs=inputs)
+        except Exception:
+            return False
+        return True
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(run, range(args.runs)))
+    with open(args.result, "w") as f:
+        json.dump({"completed": sum(outcomes), "failed": outcomes.count(False), "elapsed": time.perf_counter() - started}, f)
+
+
+def run_scenario(name: str, args: argparse.Namespace, directory: str) -> Dict[str, float]:
+    server = stub_server(args.server_rpm, args.window, args.latency, args.output_size)
+    result_path = os.path.join(directory, f"{name}.json")
+    env = os.environ | SCENARIOS[name] | {
+        "MODEL": "openai/stub",
+        "OPENAI_API_BASE": f"http://127.0.0.1:{server.server_address[1]}/v1",
+        "OPENAI_API_KEY": "stub",
+        "EA_LLM_REQUESTS_PER_MINUTE": SCENARIOS[name].get("EA_LLM_REQUESTS_PER_MINUTE", str(args.server_rpm * 0.9)),
+        "EA_LLM_BURST_SECONDS": "1",
+        "EA_LLM_BACKOFF_MAX_SECONDS": str(args.window),
+        "EA_CACHE_ENABLED": "false",
+        "EA_TASK_CACHE_ENABLED": "false",
+        "EA_CHECKPOINTS_ENABLED": "false",
+        "EA_LOG_PROFILE": "production",
+        "EA_LOG_FILE": "",
+        "OTEL_SDK_DISABLED": "true",
+    }
+    command = [sys.executable, __file__, "--child", "--result", result_path,
+               "--runs", str(args.runs), "--concurrency", str(args.concurrency)]
+    subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+    server.shutdown()
+    with open(result_path) as f:
+        return json.load(f) | {"rejected": server.rejected}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=8, help="crew runs started together")
+    parser.add_argument("--concurrency", type=int, default=8, help="crews running at once")
+    parser.add_argument("--server-rpm", type=float, default=120, help="chat completions per minute the stub allows")
+    parser.add_argument("--window", type=float, default=5.0, help="seconds the stub counts requests over")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the stub takes to answer")
+    parser.add_argument("--output-size", type=int, default=800, help="characters of free text in each stub answer")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append", help="run only these scenarios")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.scenario or SCENARIOS:
+            stats = run_scenario(name, args, directory)
+            print(
+                f"{name:<9} {stats['completed']:3d} completed  {stats['failed']:3d} failed  "
+                f"{stats['rejected']:4d} x 429  wall {stats['elapsed']:6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""API cold start: import time, time to the first /health, /ready and scoping, and memory.
+
+Import times are the best of ``--imports`` fresh interpreters, for the API module and
+for the crew stack it now loads lazily. Each server scenario then starts the API in a
+subprocess, polls ``/health`` and ``/ready`` every few milliseconds and sends one
+scoping request, answered by a local OpenAI-compatible stub server:
+
+* ``blocking``, ``background``, ``lazy``: uvicorn with that ``EA_CREW_WARMUP`` mode
+* ``prefork``: ``mining_agents.serve`` with ``--workers`` processes sharing the preloaded crew stack
+* ``prefork-no-preload``: the same, with every worker importing the crew stack itself
+
+Memory is the proportional set size (PSS) of all server processes once ready, so pages
+shared between preforked workers are only counted once.
+
+    python benchmarks/startup.py --workers 4
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+import httpx
+
+SCENARIOS = {
+    "blocking": {"EA_CREW_WARMUP": "blocking"},
+    "background": {"EA_CREW_WARMUP": "background"},
+    "lazy": {"EA_CREW_WARMUP": "lazy"},
+    "prefork": {"EA_CREW_WARMUP": "background", "EA_PRELOAD_ENABLED": "true"},
+    "prefork-no-preload": {"EA_CREW_WARMUP": "background", "EA_PRELOAD_ENABLED": "false"},
+}
+
+PROJECT = {"project_name": "Startup Benchmark", "location_region": "Skeena",
+           "cobalt_type": "Sediment-Hosted Stratiform", "scale": "Large"}
+
+
+def import_time(module: str, env: Dict[str, str]) -> float:
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def pss_mib(pid: int) -> float:
+    """PSS of the process and its children, in MiB"""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        return 0.0
+    total = 0
+    for process in pids:
+        try:
+            with open(f"/proc/{process}/smaps_rollup") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("Pss:"))
+        except (OSError, StopIteration):
+            pass
+    return total / 1024
+
+
+def poll(url: str, started: float, timeout: float) -> Optional[float]:
+    """Seconds since ``started`` at which ``url`` first answered 200"""
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def run_scenario(name: str, args: argparse.Namespace, env: Dict[str, str]) -> Dict[str, Optional[float]]:
+    port = free_port()
+    if name.startswith("prefork"):
+        command = [sys.executable, "-m", "mining_agents.serve"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "mining_agents.api:app", "--port", str(port), "--log-level", "warning"]
+    env = env | SCENARIOS[name] | {"EA_HOST": "127.0.0.1", "EA_PORT": str(port), "EA_WEB_CONCURRENCY": str(args.workers)}
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        health = poll(f"{base_url}/health", started, args.timeout)
+        ready = poll(f"{base_url}/ready", started, args.timeout)
+        memory = pss_mib(server.pid)
+        response = httpx.post(f"{base_url}/run-ea-scoping", json=PROJECT, timeout=args.timeout)
+        scoped = time.perf_counter() - started if response.status_code == 200 else None
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=args.timeout)
+    return {"health": health, "ready": ready, "scoped": scoped, "pss": memory}
+
+
+def seconds(value: Optional[float]) -> str:
+    return "   failed" if value is None else f"{value:8.2f}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="worker processes of the prefork scenarios")
+    parser.add_argument("--imports", type=int, default=3, help="fresh interpreters per import time")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each step")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append", help="run only these scenarios")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from rate_limits import stub_server
+
+    # The stub's quota is never reached; it only supplies parseable answers
+    llm_server = stub_server(rpm=1e6, window=60.0, latency=0.0, output_size=800)
+    env = os.environ | {
+        "MODEL": "openai/stub",
+        "OPENAI_API_BASE": f"http://127.0.0.1:{llm_server.server_address[1]}/v1",
+        "OPENAI_API_KEY": "stub",
+        "EA_CACHE_ENABLED": "false",
+        "EA_TASK_CACHE_ENABLED": "false",
+        "EA_CHECKPOINTS_ENABLED": "false",
+        "EA_LOG_PROFILE": "production",
+        "EA_LOG_FILE": "",
+        "OTEL_SDK_DISABLED": "true",
+    }
+
+    for module in ("mining_agents.api", "mining_agents.crew"):
+        best = min(import_time(module, env) for _ in range(args.imports))
+        print(f"import {module:<18} {best:6.2f}s")
+
+    for name in args.scenario or SCENARIOS:
+        stats = run_scenario(name, args, env)
+        print(
+            f"{name:<19} health {seconds(stats['health'])}  ready {seconds(stats['ready'])}  "
+            f"first scoping {seconds(stats['scoped'])}  PSS {stats['pss']:7.1f} MiB"
+        )
+    llm_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Deterministic offline stand-in for the agents' LLM, used by the benchmarks.
+
+Every call sleeps for a fixed latency, like waiting on a provider, and answers in the
+shape the task asks for: JSON for the structured PD outline and next steps tasks and
+for merged batch requests, padded markdown for everything else. It emits CrewAI's LLM
+call events and reports token usage, so /metrics and the timing breakdown behave as
+with a real model.
+"""
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallStartedEvent, LLMCallType
+from litellm.types.utils import Usage
+
+from mining_agents.factory import CrewFactory
+
+_ITEM_HEADING = re.compile(r"^## Item (\S+)$", re.MULTILINE)
+FILLER = "Cobalt, nickel and copper concentrations are tracked against BC water quality guidelines. "
+
+
+class StubLLM(BaseLLM):
+    # Calls made by all instances, to compare LLM requests per scoping between runs
+    calls = 0
+    _calls_lock = threading.Lock()
+
+    def __init__(self, latency: float = 0.05, output_size: int = 800):
+        super().__init__(model="stub")
+        # Seconds every call takes and characters of free text in each answer
+        self.latency = latency
+        self.output_size = output_size
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        crewai_event_bus.emit(self, event=LLMCallStartedEvent(messages=messages, tools=tools))
+        with StubLLM._calls_lock:
+            StubLLM.calls += 1
+        started = time.time()
+        prompt = messages if isinstance(messages, str) else "\n".join(str(message.get("content", "")) for message in messages)
+        time.sleep(self.latency)
+        answer = self.answer(prompt)
+        usage = Usage(prompt_tokens=len(prompt) // 4, completion_tokens=len(answer) // 4, total_tokens=(len(prompt) + len(answer)) // 4)
+        for callback in callbacks or []:
+            if hasattr(callback, "log_success_event"):
+                callback.log_success_event({}, {"usage": usage}, started, time.time())
+        crewai_event_bus.emit(self, event=LLMCallCompletedEvent(response=answer, call_type=LLMCallType.LLM_CALL))
+        return answer
+
+    def filler(self) -> str:
+        return (FILLER * (self.output_size // len(FILLER) + 1))[:self.output_size]
+
+    def answer(self, prompt: str) -> str:
+        # PromptBatcher requests are answered directly, without the agent's ReAct format
+        if '{"items": [' in prompt:
+            items = [{"id": item_id, "output": f"Summary for item {item_id}. {self.filler()}"} for item_id in _ITEM_HEADING.findall(prompt)]
+            return json.dumps({"items": items})
+        if '"sections": List[' in prompt:
+            body = json.dumps({"sections": [
+                {"title": "Project Overview", "points": ["Access road and open pit", self.filler()]},
+                {"title": "Potential Environmental Effects", "points": ["ARD/ML potential of waste rock", "Fish habitat"]},
+            ]})
+        elif '"steps": List[' in prompt:
+            body = json.dumps({"steps": [
+                {"step": "Engage the EAO", "explanation": self.filler()},
+                {"step": "Start baseline studies", "explanation": "Water quality needs a full year of data."},
+                {"step": "Contact the identified Nations", "explanation": "Early engagement shapes the scope."},
+            ]})
+        else:
+            body = f"**Summary**\n* {self.filler()}"
+        return f"Thought: I now can give a great answer\nFinal Answer: {body}"
+
+
+def install(latency: float, output_size: int) -> None:
+    """Give every crew the CrewFactory builds from now on StubLLM agents"""
+    build = CrewFactory._build
+
+    def build_with_stub(factory: CrewFactory):
+        mining_agents = build(factory)
+        for agent in mining_agents.crew().agents:
+            agent.llm = StubLLM(latency=latency, output_size=output_size)
+        return mining_agents
+
+    CrewFactory._build = build_with_stub
@@ -1,32 +1,133 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
 import json
 import os
 import sys
+import time
+import uuid
+import threading
 import uvicorn
-from typing import Optional, List
-import tempfile
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional, List, Dict
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.WARNING,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-    ]
-)
+from mining_agents.log_config import configure_logging
+
+# Configure logging (EA_LOG_PROFILE selects the development or production setup)
+configure_logging(default_level=logging.WARNING, log_file=None)
 logger = logging.getLogger(__name__)
 
 # Import your mining agents
 #sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from mining_agents.crew import MiningAgents
+# CrewAI and LiteLLM take seconds to import, so the crew stack is only loaded by
+# get_crew_factory (see EA_CREW_WARMUP); everything imported here is lightweight
+from mining_agents.llm_client import close_shared_client
+from mining_agents.llm_errors import is_rate_limit_error, retry_after
+from mining_agents.jobs import Job, JobManager, JobRunningError, JobStatus, QueueFullError
+from mining_agents.cache import CACHE_ENABLED, ResultCache, config_fingerprint, model_identity, normalize_inputs, scoping_cache_key
+from mining_agents.checkpoints import get_checkpoint_store
+from mining_agents.batch import DEFAULT_BATCH_CONCURRENCY, BatchResult, expand, group_duplicates
+from mining_agents.prompt_batcher import PROMPT_BATCHING_ENABLED, PromptBatcher
+from mining_agents.parsing import clean_markdown, parse_next_steps, parse_pd_outline
+from mining_agents.schemas import NextStep
+from mining_agents.settings import env_flag
+from mining_agents import metrics
+
+if TYPE_CHECKING:
+    from crewai.tasks.task_output import TaskOutput
+    from mining_agents.factory import CrewFactory
 
 # Create output directory if it doesn't exist
 os.makedirs('output', exist_ok=True)
 
-app = FastAPI(title="Mining Agents API")
+# Seconds a client should wait before retrying when the job queue is full
+QUEUE_FULL_RETRY_AFTER = os.getenv("EA_QUEUE_FULL_RETRY_AFTER", "5")
+
+# Bounded worker pool for crew runs, sized from EA_MAX_WORKERS / EA_MAX_QUEUE
+job_manager = JobManager()
+
+# When the crew stack is loaded: "background" starts building the crew pool as the
+# server comes up without holding back /health, "blocking" finishes it before the server
+# accepts requests, "lazy" waits for the first scoping request
+CREW_WARMUP_MODES = ('background', 'blocking', 'lazy')
+CREW_WARMUP = os.getenv("EA_CREW_WARMUP", "background").lower()
+if CREW_WARMUP not in CREW_WARMUP_MODES:
+    raise ValueError(f"Unknown EA_CREW_WARMUP '{CREW_WARMUP}', expected one of {CREW_WARMUP_MODES}")
+
+# Prebuilt crews reused across runs, kept in memory instead of writing markdown files
+_crew_factory: Optional["CrewFactory"] = None
+_crew_factory_lock = threading.Lock()
+# Set once the crew pool is built, for GET /ready
+crews_warm = threading.Event()
+
+# Persistent EAResponse cache keyed on normalized inputs, prompt config and model
+CACHE_HEADER = "X-Cache"
+CACHE_NAMESPACE = "ea-response"
+result_cache = ResultCache() if CACHE_ENABLED else None
+
+# Per-task outputs of every run, keyed by job id, so a failed job can be resumed
+checkpoint_store = get_checkpoint_store()
+JOB_ID_HEADER = "X-Job-Id"
+
+# Requests for a project that is already being scoped attach to that run instead of starting another
+SINGLE_FLIGHT_ENABLED = env_flag("EA_SINGLE_FLIGHT_ENABLED", True)
+
+# Seconds a batch waits before offering a project to a full job queue again
+BATCH_RETRY_INTERVAL = float(os.getenv("EA_BATCH_RETRY_INTERVAL", "1"))
+
+metrics.add_gauge("ea_jobs_in_flight", "Scoping jobs running or queued", lambda: job_manager.in_flight)
+metrics.add_gauge("ea_crew_pool_idle", "Prebuilt crews waiting in the pool", lambda: _crew_factory.idle if _crew_factory else 0)
+
+# Keep proxies from buffering Server-Sent Events
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def get_crew_factory() -> "CrewFactory":
+    """The process's CrewFactory, importing CrewAI and creating it on first use"""
+    global _crew_factory
+    with _crew_factory_lock:
+        if _crew_factory is None:
+            started = time.perf_counter()
+            from mining_agents.factory import CrewFactory
+
+            _crew_factory = CrewFactory(output_base_dir=None)
+            logger.info(f"Crew stack loaded in {time.perf_counter() - started:.2f}s")
+        return _crew_factory
+
+def warm_crews() -> None:
+    """Load the crew stack and fill the crew pool; failures are logged, not raised"""
+    try:
+        get_crew_factory().warm()
+    except Exception as e:
+        logger.error(f"Warming the crew pool failed: {str(e)}")
+        return
+    crews_warm.set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = None
+    # Hash the prompt config and resolve the model now rather than in the first request
+    config_fingerprint()
+    model_identity()
+    if CREW_WARMUP == "blocking":
+        await asyncio.to_thread(warm_crews)
+    elif CREW_WARMUP == "background":
+        # Kept referenced so the task is not garbage collected while it runs
+        warmup = asyncio.ensure_future(asyncio.to_thread(warm_crews))
+    yield
+    if warmup is not None:
+        # A worker thread cannot be cancelled; let the build finish before closing the client it uses
+        await warmup
+    job_manager.shutdown(wait=False)
+    if result_cache is not None:
+        result_cache.close()
+    if checkpoint_store is not None:
+        checkpoint_store.close()
+    close_shared_client()
+
+app = FastAPI(title="Mining Agents API", lifespan=lifespan)
 
 # Add CORS middleware to allow Retool to call your API
 app.add_middleware(
@@ -44,9 +145,21 @@ class ProjectInput(BaseModel):
     cobalt_type: str
     scale: str
 
-class NextStep(BaseModel):
-    step: str
-    explanation: str
+class TaskMetrics(BaseModel):
+    agent: str
+    source: str
+    duration: Optional[float] = None
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    retries: int = 0
+
+class TimingBreakdown(BaseModel):
+    queue_wait: Optional[float] = None
+    crew: Optional[float] = None
+    tasks: Dict[str, TaskMetrics] = {}
 
 class EAResponse(BaseModel):
     project_parameters: dict
@@ -54,6 +167,21 @@ class EAResponse(BaseModel):
     pd_outline: Optional[dict] = None
     indigenous_nations: Optional[str] = None
     next_steps: Optional[List[NextStep]] = None
+    task_timings: Optional[Dict[str, Optional[float]]] = None
+    task_cache_hits: Optional[Dict[str, bool]] = None
+    task_rule_hits: Optional[Dict[str, bool]] = None
+    task_batched: Optional[Dict[str, bool]] = None
+    task_resumed: Optional[Dict[str, bool]] = None
+    timing: Optional[TimingBreakdown] = None
+
+class JobInfo(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[EAResponse] = None
 
 # Add a root route for testing
 @app.get("/")
@@ -67,177 +195,433 @@ async def health_check():
     logger.info("Health check endpoint accessed")
     return {"status": "healthy"}
 
-@app.post("/run-ea-scoping", response_model=EAResponse)
-async def run_ea_scoping(input_data: ProjectInput):
-    """Run the EA scoping process with the mining agents"""
+@app.get("/ready", responses={503: {"description": "The crew pool is still warming up"}})
+async def readiness_check():
+    """Whether scoping requests are served without waiting for the crew pool to build.
+
+    Liveness stays on ``/health``, which answers as soon as the server is up. In lazy
+    warm-up mode the crews are built by the first request, so the API is always ready.
+    """
+    if CREW_WARMUP != "lazy" and not crews_warm.is_set():
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics: task and LLM call latency, tokens, retries and queue wait"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+# Response field and parser for each task's markdown output
+TASK_SECTIONS = {
+    'regulatory_check_task': ('regulatory_check', clean_markdown),
+    'pd_outline_task': ('pd_outline', parse_pd_outline),
+    'indigenous_nation_id_task': ('indigenous_nations', clean_markdown),
+    'next_steps_task': ('next_steps', parse_next_steps),
+}
+
+def _section_content(task_name: str, task_output: "TaskOutput") -> Any:
+    """A task's response section, read from its validated output model when it has one"""
+    if task_output.pydantic is not None and hasattr(task_output.pydantic, 'to_response'):
+        return task_output.pydantic.to_response()
+    _, parse = TASK_SECTIONS[task_name]
+    return parse(task_output.raw)
+
+def _execute_ea_scoping(
+    input_data: ProjectInput,
+    on_task_complete: Optional[Callable[[str, "TaskOutput"], None]] = None,
+    prompt_batcher: Optional[PromptBatcher] = None,
+    run_id: Optional[str] = None,
+) -> dict:
+    """Run the mining agents crew for one project and assemble the EA response (blocking).
+
+    With a ``run_id`` every task output is checkpointed, and a run that failed before
+    under the same id resumes after its last completed task.
+    """
     logger.info(f"Starting EA scoping for project: {input_data.project_name}")
+    # Prepare inputs for CrewAI
+    inputs = {
+        'project_name': input_data.project_name,
+        'location_region': input_data.location_region,
+        'cobalt_type': input_data.cobalt_type,
+        'scale': input_data.scale
+    }
+    logger.debug(f"Input parameters: {inputs}")
+
+    # Run a pooled crew, keeping every task output in memory instead of writing markdown files
+    with get_crew_factory().acquire(on_task_complete=on_task_complete, prompt_batcher=prompt_batcher, run_id=run_id) as mining_agents:
+        result = mining_agents.crew().kickoff(inputs=inputs)
+        logger.info("Mining Agents crew execution completed")
+        logger.debug(f"Crew result: {result}")
+
+        response_data = {
+            "project_parameters": inputs,
+            "task_timings": mining_agents.task_timings,
+            "task_cache_hits": mining_agents.task_cache_hits,
+            "task_rule_hits": mining_agents.task_rule_hits,
+            "task_batched": mining_agents.task_batched,
+            "task_resumed": mining_agents.task_resumed,
+            "timing": {"crew": mining_agents.run_wall_time, "tasks": mining_agents.task_metrics},
+        }
+        task_outputs = mining_agents.task_outputs
+
+    # Parse each task's output into its response section
+    for task_name, (section, _) in TASK_SECTIONS.items():
+        task_output = task_outputs.get(task_name)
+        if task_output is None:
+            logger.warning("No output from %s for section %s", task_name, section)
+            continue
+        response_data[section] = _section_content(task_name, task_output)
+
+    logger.info(f"EA scoping for project {input_data.project_name} completed successfully")
+    return response_data
+
+def _job_info(job: Job) -> JobInfo:
+    return JobInfo(
+        job_id=job.id,
+        status=job.status.value,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        result=job.result if job.status == JobStatus.COMPLETED else None,
+    )
+
+def _with_queue_wait(result: dict, job: Job) -> dict:
+    """Copy of a fresh result with the job's queue wait added to its timing breakdown"""
+    if not result.get("timing"):
+        return result
+    return {**result, "timing": {**result["timing"], "queue_wait": job.queue_wait}}
+
+# Response fields describing the run that produced it, which no crew ran for on a cache hit
+RUN_FIELDS = ('task_timings', 'task_cache_hits', 'task_rule_hits', 'task_batched', 'task_resumed', 'timing')
+
+def _without_run_fields(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key not in RUN_FIELDS}
+
+async def _cached_result(cache_key: str, bypass_cache: bool) -> Optional[dict]:
+    """The cached response for a project, or None; entries cached with run fields have them dropped"""
+    if bypass_cache:
+        return None
+    cached = await asyncio.to_thread(result_cache.get, cache_key)
+    return None if cached is None else _without_run_fields(cached)
+
+def _server_timing(timing: dict) -> str:
+    """Server-Timing header value, in milliseconds, so browser dev tools show the breakdown"""
+    entries = [("queue", timing.get("queue_wait")), ("crew", timing.get("crew"))]
+    entries += [(name, task.get("duration")) for name, task in timing.get("tasks", {}).items()]
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in entries if seconds is not None)
+
+class _InFlightRun:
+    """A scoping run that identical requests arriving while it runs attach to.
+
+    Task outputs are kept and passed on to every attached listener, so a stream that
+    joins late first receives the sections that are already finished.
+    """
+
+    def __init__(self):
+        self.job: Optional[Job] = None
+        self._outputs: Dict[str, "TaskOutput"] = {}
+        self._listeners: List[Callable[[str, "TaskOutput"], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[str, "TaskOutput"], None]) -> None:
+        with self._lock:
+            for task_name, output in self._outputs.items():
+                listener(task_name, output)
+            self._listeners.append(listener)
+
+    def publish(self, task_name: str, output: "TaskOutput") -> None:
+        # Called from crew worker threads as each task finishes
+        with self._lock:
+            self._outputs[task_name] = output
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(task_name, output)
+
+# In-flight runs by project, for single-flight coalescing
+_in_flight: Dict[str, _InFlightRun] = {}
+_in_flight_lock = threading.Lock()
+
+def _single_flight_key(input_data: ProjectInput) -> str:
+    # Prompt configuration and model are fixed for the life of the process, so the
+    # normalized inputs alone identify the run
+    return json.dumps(normalize_inputs(input_data.model_dump()), sort_keys=True)
+
+def _submit_scoping(
+    input_data: ProjectInput,
+    cache_key: Optional[str],
+    endpoint: str,
+    on_task_complete: Optional[Callable[[str, "TaskOutput"], None]] = None,
+    prompt_batcher: Optional[PromptBatcher] = None,
+    checkpoint: bool = True,
+) -> Job:
+    """Queue a scoping run, or return the identical run already in flight.
+
+    However many requests for a project arrive while it is being scoped, one crew runs
+    and every request gets its result (and its sections, through ``on_task_complete``).
+    With ``checkpoint`` the run is checkpointed under its job id. Raises QueueFullError
+    like JobManager.submit; attaching to a run in flight never needs room on the queue.
+    """
+    key = _single_flight_key(input_data) if SINGLE_FLIGHT_ENABLED else None
+    with _in_flight_lock:
+        run = _in_flight.get(key) if key is not None else None
+        if run is not None and not run.job.done:
+            if on_task_complete is not None:
+                run.subscribe(on_task_complete)
+            metrics.REQUESTS_COALESCED.inc(endpoint=endpoint)
+            logger.info(f"EA scoping for project {input_data.project_name} joins job {run.job.id} in flight")
+            return run.job
+        run = _InFlightRun()
+        if on_task_complete is not None:
+            run.subscribe(on_task_complete)
+        job_id = uuid.uuid4().hex if checkpoint else None
+        run.job = job_manager.submit(_execute_and_cache, input_data, cache_key, run.publish, prompt_batcher, job_id, job_id=job_id)
+        if key is not None:
+            _in_flight[key] = run
+    run.job.future.add_done_callback(lambda _: _forget_in_flight(key, run))
+    return run.job
+
+def _forget_in_flight(key: Optional[str], run: _InFlightRun) -> None:
+    """Stop routing new requests to a finished run; later ones hit the result cache or run again"""
+    with _in_flight_lock:
+        if key is not None and _in_flight.get(key) is run:
+            del _in_flight[key]
+
+def _execute_and_cache(
+    input_data: ProjectInput,
+    cache_key: Optional[str],
+    on_task_complete: Optional[Callable[[str, "TaskOutput"], None]] = None,
+    prompt_batcher: Optional[PromptBatcher] = None,
+    run_id: Optional[str] = None,
+) -> dict:
+    response_data = _execute_ea_scoping(input_data, on_task_complete, prompt_batcher, run_id)
+    if cache_key is not None:
+        result_cache.set(cache_key, _without_run_fields(response_data))
+    return response_data
+
+@app.post(
+    "/run-ea-scoping",
+    response_model=EAResponse,
+    responses={202: {"model": JobInfo}, 429: {"description": "Job queue is full"}, 500: {"description": "The crew failed; resume it with POST /jobs/{job_id}/resume"}},
+)
+async def run_ea_scoping(input_data: ProjectInput, response: Response, background: bool = False, bypass_cache: bool = False):
+    """Run the EA scoping process with the mining agents.
+
+    The crew always runs on the job worker pool so the event loop stays responsive.
+    With ``?background=true`` the job is only queued and its id returned; poll
+    ``GET /jobs/{job_id}`` for the result. Identical requests are answered from the
+    result cache (``X-Cache: HIT``) unless ``?bypass_cache=true`` forces a fresh run.
+    A request for a project that is being scoped right now waits for that run instead
+    of starting its own, with or without ``bypass_cache``. Every task output is
+    checkpointed under the job id (``X-Job-Id`` on errors), so a failed run can be
+    continued with ``POST /jobs/{job_id}/resume``.
+    """
+    cache_key = None
+    cache_status = "DISABLED"
+    if result_cache is not None:
+        cache_key = scoping_cache_key(input_data.model_dump(), CACHE_NAMESPACE)
+        cached = await _cached_result(cache_key, bypass_cache)
+        if cached is not None:
+            logger.info(f"Serving EA scoping for project {input_data.project_name} from cache")
+            if background:
+                job = job_manager.add_completed(cached)
+                return JSONResponse(status_code=202, content=_job_info(job).model_dump(mode="json"), headers={CACHE_HEADER: "HIT"})
+            response.headers[CACHE_HEADER] = "HIT"
+            return cached
+        cache_status = "BYPASS" if bypass_cache else "MISS"
+
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Prepare inputs for CrewAI
-            inputs = {
-                'project_name': input_data.project_name,
-                'location_region': input_data.location_region,
-                'cobalt_type': input_data.cobalt_type,
-                'scale': input_data.scale
-            }
-            logger.debug(f"Input parameters: {inputs}")
-
-            regulatory_md_path = os.path.join(temp_dir, 'regulatory_check.md')
-            pd_md_path = os.path.join(temp_dir, 'pd_outline.md')
-            indigenous_md_path = os.path.join(temp_dir, 'indigenous_nations.md')
-            next_steps_md_path = os.path.join(temp_dir, 'next_steps.md')
-            
-            # Run the Crew
-            logger.info("Initializing Mining Agents crew")
-            result = MiningAgents(output_base_dir=temp_dir).crew().kickoff(inputs=inputs)
-            logger.info("Mining Agents crew execution completed")
-            print(result)
-            
-            # Read output files for response
-            response_data = {
-                "project_parameters": inputs
-            }
-
-            # Read regulatory check results if file exists
-            if os.path.exists(regulatory_md_path):
-                logger.debug(f"Reading regulatory check from {regulatory_md_path}")
-                with open(regulatory_md_path, 'r') as f:
-                    regulatory_content = f.read()
-                    # Ensure proper Markdown formatting
-                    regulatory_content = regulatory_content.replace('\n\n', '\n')
-                    # Make sure bullet points are properly formatted
-                    regulatory_content = regulatory_content.replace('*   ', '* ')
-                    response_data["regulatory_check"] = regulatory_content
-            else:
-                logger.warning("Regulatory check file does not exist, for path %s", str(regulatory_md_path))
-            
-            # Read project description outline if file exists
-            if os.path.exists(pd_md_path):
-                logger.debug(f"Reading project description from {pd_md_path}")
-                with open(pd_md_path, 'r') as f:
-                    pd_content = f.read()
-                    # Parse into sections
-                    sections = {}
-                    current_section = None
-                    content_lines = []
-                    
-                    # Use a regex approach to extract sections more reliably
-                    import re
-                    # Find all section headers and their content
-                    section_pattern = r'\*\*(.*?)\*\*(.*?)(?=\*\*.*?\*\*|\Z)'
-                    matches = re.findall(section_pattern, pd_content, re.DOTALL)
-                    
-                    if matches:
-                        logger.debug(f"Found {len(matches)} sections in project description")
-                        for section_name, content in matches:
-                            # Clean up the section name and content
-                            clean_section = section_name.strip()
-                            clean_content = content.strip()
-                            sections[clean_section] = clean_content
-                    else:
-                        # Fall back to the original approach if regex fails
-                        logger.warning("Regex pattern failed to match project description sections, falling back to alternative parsing")
-                        for line in pd_content.split('\n'):
-                            if line.startswith('**'):  # Section header
-                                # Save previous section if it exists
-                                if current_section and content_lines:
-                                    sections[current_section] = '\n'.join(content_lines)
-                                    content_lines = []
-                                # Extract new section name
-                                current_section = line.strip('*').strip()
-                            elif line.strip() and current_section:
-                                content_lines.append(line)
-                        
-                        # Save final section
-                        if current_section and content_lines:
-                            sections[current_section] = '\n'.join(content_lines)
-                    
-                    response_data["pd_outline"] = sections
-            else:
-                logger.warning("Project description outline file does not exist, for path %s", str(pd_md_path))
-                
-            # Read indigenous nations info if file exists
-            if os.path.exists(indigenous_md_path):
-                logger.debug(f"Reading indigenous nations info from {indigenous_md_path}")
-                with open(indigenous_md_path, 'r') as f:
-                    indigenous_content = f.read()
-                    # Ensure proper Markdown formatting and line breaks
-                    # Replace any problematic characters and ensure consistent formatting
-                    indigenous_content = indigenous_content.replace('\n\n', '\n')
-                    # Make sure bullet points are properly formatted
-                    indigenous_content = indigenous_content.replace('*   ', '* ')
-                    response_data["indigenous_nations"] = indigenous_content
-            else:
-                logger.warning("Indigenous nations info file does not exist, for path %s", str(indigenous_md_path))
-        
-            # Read next steps if file exists
-            if os.path.exists(next_steps_md_path):
-                logger.debug(f"Reading next steps from {next_steps_md_path}")
-                with open(next_steps_md_path, 'r') as f:
-                    next_steps_content = f.read()
-                    # Parse the next steps into structured format
-                    next_steps = []
-                    
-                    # Split the content by numbered items (1., 2., 3.)
-                    import re
-                    # Find all numbered items with their explanations
-                    step_pattern = r'(\d+\.)\s+(.*?)(?=\d+\.\s+|\Z)'
-                    matches = re.findall(step_pattern, next_steps_content, re.DOTALL)
-                    
-                    for _, match in matches:
-                        # The first line is the step title, the rest is the explanation
-                        lines = [line.strip() for line in match.strip().split('\n')]
-                        if lines:
-                            step = lines[0]
-                            explanation = ' '.join(lines[1:]) if len(lines) > 1 else ""
-                            next_steps.append({
-                                "step": step,
-                                "explanation": explanation
-                            })
-                    
-                    # If regex didn't work, fall back to the original approach
-                    if not next_steps:
-                        current_step = None
-                        explanation_lines = []
-                        
-                        for line in next_steps_content.split('\n'):
-                            if line.strip():
-                                if line.startswith('1.') or line.startswith('2.') or line.startswith('3.'):
-                                    # If we have a previous step, save it
-                                    if current_step and explanation_lines:
-                                        next_steps.append({
-                                            "step": current_step,
-                                            "explanation": ' '.join(explanation_lines)
-                                        })
-                                        explanation_lines = []
-                                    
-                                    # Extract the step text (after the number and period)
-                                    parts = line.split('.', 1)
-                                    if len(parts) > 1:
-                                        current_step = parts[1].strip()
-                                    else:
-                                        current_step = line.strip()
-                                elif current_step:
-                                    # Add this line to the explanation
-                                    explanation_lines.append(line.strip())
-                        
-                        # Add the last step if it exists
-                        if current_step and explanation_lines:
-                            next_steps.append({
-                                "step": current_step,
-                                "explanation": ' '.join(explanation_lines)
-                            })
-                
-                response_data["next_steps"] = next_steps
-            else:
-                logger.warning("Next steps file does not exist for path %s", str(next_steps_md_path))
-        
-        logger.info(f"EA scoping for project {input_data.project_name} completed successfully")
-        return response_data
-        
+        job = _submit_scoping(input_data, cache_key, "background" if background else "sync")
+    except QueueFullError as e:
+        logger.warning(f"Rejecting EA scoping for project {input_data.project_name}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": QUEUE_FULL_RETRY_AFTER})
+
+    if background:
+        return JSONResponse(status_code=202, content=_job_info(job).model_dump(mode="json"), headers={CACHE_HEADER: cache_status})
+
+    try:
+        result = await asyncio.wrap_future(job.future)
     except Exception as e:
-        logger.error(f"Error in EA scoping process: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error running EA scoping: {str(e)}")
+        if is_rate_limit_error(e):
+            # The LLM provider is still rate limiting after the task retries; the request itself was fine
+            wait = retry_after(e) or float(QUEUE_FULL_RETRY_AFTER)
+            raise HTTPException(
+                status_code=503,
+                detail=f"LLM provider rate limit: {str(e)}",
+                headers={"Retry-After": str(round(wait)), JOB_ID_HEADER: job.id},
+            )
+        raise HTTPException(status_code=500, detail=f"Error running EA scoping: {str(e)}", headers={JOB_ID_HEADER: job.id})
+    response.headers[CACHE_HEADER] = cache_status
+    result = _with_queue_wait(result, job)
+    if result.get("timing"):
+        response.headers["Server-Timing"] = _server_timing(result["timing"])
+    return result
+
+async def _scope_batch_item(input_data: ProjectInput, bypass_cache: bool, prompt_batcher: Optional[PromptBatcher]) -> dict:
+    """Scope one project of a batch, waiting for queue room instead of failing with 429"""
+    cache_key = None
+    if result_cache is not None:
+        cache_key = scoping_cache_key(input_data.model_dump(), CACHE_NAMESPACE)
+        cached = await _cached_result(cache_key, bypass_cache)
+        if cached is not None:
+            return cached
+
+    while True:
+        try:
+            job = _submit_scoping(input_data, cache_key, "batch", prompt_batcher=prompt_batcher, checkpoint=False)
+            break
+        except QueueFullError:
+            await asyncio.sleep(BATCH_RETRY_INTERVAL)
+    return await asyncio.wrap_future(job.future)
+
+@app.post("/run-ea-scoping/batch", response_class=StreamingResponse)
+async def run_ea_scoping_batch(
+    items: List[ProjectInput],
+    bypass_cache: bool = False,
+    max_concurrency: int = Query(DEFAULT_BATCH_CONCURRENCY, ge=1),
+):
+    """Scope a portfolio of projects, streaming one JSON line per project as each finishes.
+
+    Identical projects are scoped once. At most ``max_concurrency`` projects of the
+    batch run at a time, all on the shared job worker pool. Every line carries the
+    project's ``index`` in the request, its ``status`` and either the EAResponse as
+    ``result`` or an ``error``; a failing project does not stop the others. Intake and
+    regulatory prompts of projects running at the same time share one LLM request.
+    """
+    inputs = [item.model_dump() for item in items]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    prompt_batcher = PromptBatcher() if PROMPT_BATCHING_ENABLED else None
+
+    async def scope(indices: List[int]) -> List[BatchResult]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await _scope_batch_item(items[indices[0]], bypass_cache, prompt_batcher)
+            except Exception as e:
+                logger.error(f"Batch project {items[indices[0]].project_name} failed: {str(e)}")
+                duration = round(time.perf_counter() - started, 4)
+                return expand(indices, inputs, "failed", error=f"Error running EA scoping: {str(e)}", duration=duration)
+            duration = round(time.perf_counter() - started, 4)
+        response_data = EAResponse(**result).model_dump(mode="json")
+        return expand(indices, inputs, "completed", result=response_data, duration=duration)
+
+    async def stream() -> AsyncIterator[str]:
+        pending = [asyncio.ensure_future(scope(indices)) for indices in group_duplicates(inputs).values()]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                for batch_result in await next_done:
+                    yield batch_result.to_json() + "\n"
+        finally:
+            # Client went away; projects already on the job pool still finish and are cached
+            for scope_task in pending:
+                scope_task.cancel()
+
+    logger.info(f"Starting EA scoping batch of {len(items)} projects")
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _section_event(task_name: str, content: Any) -> str:
+    return _sse_event("section", {"task": task_name, "section": TASK_SECTIONS[task_name][0], "content": content})
+
+@app.get("/run-ea-scoping/stream", responses={429: {"description": "Job queue is full"}})
+async def stream_ea_scoping(input_data: ProjectInput = Depends(), bypass_cache: bool = False):
+    """Run the EA scoping process and stream each section as a Server-Sent Event.
+
+    A ``section`` event is sent as soon as each task finishes, carrying the parsed
+    section (regulatory check, PD outline, Indigenous Nations or next steps). The
+    stream ends with a ``result`` event holding the full EAResponse, or an ``error``
+    event if the crew failed.
+    """
+    cache_key = None
+    if result_cache is not None:
+        cache_key = scoping_cache_key(input_data.model_dump(), CACHE_NAMESPACE)
+        cached = await _cached_result(cache_key, bypass_cache)
+        if cached is not None:
+            logger.info(f"Streaming EA scoping for project {input_data.project_name} from cache")
+
+            async def replay_cached() -> AsyncIterator[str]:
+                for task_name, (section, _) in TASK_SECTIONS.items():
+                    if cached.get(section) is not None:
+                        yield _section_event(task_name, cached[section])
+                yield _sse_event("result", cached)
+
+            return StreamingResponse(replay_cached(), media_type="text/event-stream", headers=SSE_HEADERS | {CACHE_HEADER: "HIT"})
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_task_complete(task_name: str, output: "TaskOutput") -> None:
+        # Called from crew worker threads; hand the output over to the event loop
+        loop.call_soon_threadsafe(events.put_nowait, (task_name, output))
+
+    try:
+        job = _submit_scoping(input_data, cache_key, "stream", on_task_complete)
+    except QueueFullError as e:
+        logger.warning(f"Rejecting EA scoping stream for project {input_data.project_name}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": QUEUE_FULL_RETRY_AFTER})
+    # Task callbacks always fire before the crew returns, so this sentinel is queued last
+    job.future.add_done_callback(lambda _: loop.call_soon_threadsafe(events.put_nowait, None))
+
+    async def stream() -> AsyncIterator[str]:
+        yield _sse_event("job", {"job_id": job.id})
+        while (item := await events.get()) is not None:
+            task_name, output = item
+            if task_name in TASK_SECTIONS:
+                yield _section_event(task_name, _section_content(task_name, output))
+        if job.status == JobStatus.COMPLETED:
+            yield _sse_event("result", EAResponse(**job.result).model_dump(mode="json"))
+        else:
+            yield _sse_event("error", {"detail": f"Error running EA scoping: {job.error}"})
+
+    cache_status = "DISABLED" if result_cache is None else ("BYPASS" if bypass_cache else "MISS")
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS | {CACHE_HEADER: cache_status})
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """Return the status of a scoping job, including the EAResponse once it has completed"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_info(job)
+
+@app.post(
+    "/jobs/{job_id}/resume",
+    response_model=JobInfo,
+    status_code=202,
+    responses={404: {"description": "No checkpoint for this job"}, 409: {"description": "Job is running or already completed"}, 429: {"description": "Job queue is full"}},
+)
+async def resume_job(job_id: str):
+    """Re-run a failed scoping job, reusing the output of every task that completed before.
+
+    Only the tasks without a checkpoint call the LLM again. The job keeps its id, so poll
+    ``GET /jobs/{job_id}`` for the result. Checkpoints are durable, so a job can also be
+    resumed after the API restarted.
+    """
+    if checkpoint_store is None:
+        raise HTTPException(status_code=404, detail="Checkpoints are disabled")
+    job = job_manager.get(job_id)
+    if job is not None and not job.done:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job.status.value}")
+    run = await asyncio.to_thread(checkpoint_store.get_run, job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No checkpoint for job {job_id}")
+    if run["completed"]:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already completed")
+
+    input_data = ProjectInput(**run["inputs"])
+    cache_key = scoping_cache_key(input_data.model_dump(), CACHE_NAMESPACE) if result_cache is not None else None
+    try:
+        job = job_manager.submit(_execute_and_cache, input_data, cache_key, run_id=job_id, job_id=job_id)
+    except QueueFullError as e:
+        logger.warning(f"Rejecting resume of job {job_id}: {str(e)}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": QUEUE_FULL_RETRY_AFTER})
+    except JobRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"Resuming job {job_id} with {len(run['tasks'])} checkpointed tasks")
+    return JSONResponse(status_code=202, content=_job_info(job).model_dump(mode="json"))
+
 
 if __name__ == "__main__":
     logger.info("Starting Mining Agents API server")
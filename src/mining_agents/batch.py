@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from mining_agents.cache import normalize_inputs
+
+logger = logging.getLogger(__name__)
+
+# Projects of one batch scoped at the same time
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("EA_BATCH_CONCURRENCY", os.getenv("EA_MAX_WORKERS", "4")))
+
+
+@dataclass
+class BatchResult:
+    """Outcome for one project of a batch, serialized as one JSONL line."""
+    index: int
+    input: Dict[str, Any]
+    status: str
+    result: Any = None
+    error: Optional[str] = None
+    # Seconds spent scoping the project, shared by duplicates of it
+    duration: Optional[float] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def batch_key(inputs: Dict[str, Any]) -> str:
+    """Identity of a project within a batch, compared after ``normalize_inputs``.
+
+    Inputs differing only in whitespace, or in the case of ``scale``, match. Other fields
+    are case sensitive, as the project name and region are written into the report.
+    """
+    return json.dumps(normalize_inputs(inputs), sort_keys=True)
+
+
+def group_duplicates(items: Sequence[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Map each distinct input to the positions it appears at, in first-seen order"""
+    groups: Dict[str, List[int]] = {}
+    for index, inputs in enumerate(items):
+        groups.setdefault(batch_key(inputs), []).append(index)
+    return groups
+
+
+def expand(
+    indices: List[int],
+    items: Sequence[Dict[str, Any]],
+    status: str,
+    result: Any = None,
+    error: Optional[str] = None,
+    duration: Optional[float] = None,
+) -> List[BatchResult]:
+    """One BatchResult per position of a deduplicated input"""
+    return [
+        BatchResult(index=index, input=dict(items[index]), status=status, result=result, error=error, duration=duration)
+        for index in indices
+    ]
+
+
+def run_batch(
+    items: Sequence[Dict[str, Any]],
+    fn: Callable[[Dict[str, Any]], Any],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> Iterator[BatchResult]:
+    """Call ``fn`` once per distinct input, yielding results in completion order.
+
+    At most ``max_concurrency`` calls run at once. Duplicate inputs share a single call
+    and are yielded together. A call that raises produces ``failed`` results for its
+    inputs; the rest of the batch carries on.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    groups = group_duplicates(items)
+    logger.info(f"Running batch of {len(items)} projects ({len(groups)} distinct) with concurrency {max_concurrency}")
+
+    durations: Dict[int, float] = {}
+
+    def timed(index: int) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(items[index])
+        finally:
+            durations[index] = round(time.perf_counter() - started, 4)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ea-batch") as executor:
+        futures = {executor.submit(timed, indices[0]): indices for indices in groups.values()}
+        for future in as_completed(futures):
+            indices = futures[future]
+            try:
+                yield from expand(indices, items, "completed", result=future.result(), duration=durations.get(indices[0]))
+            except Exception as e:
+                logger.error(f"Batch item {indices[0]} failed: {str(e)}", exc_info=True)
+                yield from expand(indices, items, "failed", error=str(e), duration=durations.get(indices[0]))
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import functools
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from mining_agents.settings import env_flag, process_singleton
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent / 'config'
+
+# Whole-run results, by normalized inputs, prompt configuration and model
+CACHE_ENABLED = env_flag("EA_CACHE_ENABLED", True)
+DEFAULT_CACHE_PATH = os.getenv("EA_CACHE_PATH", os.path.join("output", "ea_cache.sqlite3"))
+DEFAULT_CACHE_TTL_SECONDS = int(os.getenv("EA_CACHE_TTL_SECONDS", str(24 * 3600)))
+DEFAULT_CACHE_MAX_ENTRIES = int(os.getenv("EA_CACHE_MAX_ENTRIES", "1000"))
+# Per-task outputs, kept as long as whole-run results
+TASK_CACHE_ENABLED = env_flag("EA_TASK_CACHE_ENABLED", True)
+DEFAULT_TASK_CACHE_PATH = os.getenv("EA_TASK_CACHE_PATH", os.path.join("output", "ea_task_cache.sqlite3"))
+DEFAULT_TASK_CACHE_MAX_ENTRIES = int(os.getenv("EA_TASK_CACHE_MAX_ENTRIES", "5000"))
+
+# Bump when the shape of cached payloads changes so stale entries are never served
+CACHE_SCHEMA_VERSION = 1
+
+# CrewAI's fallback model (crewai.cli.constants.DEFAULT_LLM_MODEL), copied so that
+# computing a cache key never imports CrewAI
+DEFAULT_LLM_MODEL = "gpt-4o-mini"
+
+
+def normalize_inputs(inputs: Dict[str, Any]) -> Dict[str, str]:
+    """Normalize project parameters so trivially different requests share a cache entry"""
+    normalized = {key: ' '.join(str(value).split()) for key, value in inputs.items()}
+    if 'scale' in normalized:
+        normalized['scale'] = normalized['scale'].capitalize()
+    return normalized
+
+
+@functools.lru_cache(maxsize=None)
+def config_fingerprint(config_dir: Path = CONFIG_DIR) -> str:
+    """Hash agents.yaml, tasks.yaml and rules.yaml so editing a prompt or rule invalidates cached results.
+
+    Read once per process, like the crews that load the same files.
+    """
+    digest = hashlib.sha256()
+    for name in ('agents.yaml', 'tasks.yaml', 'rules.yaml'):
+        digest.update(name.encode())
+        digest.update((config_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def model_identity() -> str:
+    """Identify the LLM the agents will use, following CrewAI's own environment lookup"""
+    from dotenv import dotenv_values, find_dotenv
+
+    # CrewAI loads .env when it is imported, which may not have happened yet
+    dotenv_path = find_dotenv(usecwd=True)
+    environment = {**(dotenv_values(dotenv_path) if dotenv_path else {}), **os.environ}
+    model = (
+        environment.get("MODEL")
+        or environment.get("MODEL_NAME")
+        or environment.get("OPENAI_MODEL_NAME")
+        or DEFAULT_LLM_MODEL
+    )
+    base_url = environment.get("OPENAI_API_BASE") or environment.get("BASE_URL") or ""
+    return f"{model}@{base_url}" if base_url else model
+
+
+def scoping_cache_key(inputs: Dict[str, Any], namespace: str) -> str:
+    """Content address for a scoping run: inputs, prompt configuration and model"""
+    payload = {
+        'version': CACHE_SCHEMA_VERSION,
+        'namespace': namespace,
+        'inputs': normalize_inputs(inputs),
+        'config': config_fingerprint(),
+        'model': model_identity(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class SQLiteStore:
+    """SQLite database shared by the threads of a process, with every statement run under ``_lock``.
+
+    The file is opened in WAL mode so several worker processes may use it at once.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache(SQLiteStore):
+    """Persistent JSON cache backed by SQLite with TTL expiry and LRU eviction.
+
+    Entries older than ``ttl_seconds`` are treated as misses and removed. Once the
+    cache holds more than ``max_entries`` rows the least recently read ones are
+    evicted. The database file survives restarts and may be shared by several
+    worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: int = DEFAULT_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+    ):
+        super().__init__(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+        logger.info(f"Result cache at {path} (ttl {ttl_seconds}s, max {max_entries} entries)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drop expired rows, then the least recently used ones above max_entries. Caller must hold the lock."""
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            """DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,),
+        )
+
+
+@process_singleton
+def _open_task_cache() -> ResultCache:
+    return ResultCache(
+        path=DEFAULT_TASK_CACHE_PATH,
+        ttl_seconds=DEFAULT_CACHE_TTL_SECONDS,
+        max_entries=DEFAULT_TASK_CACHE_MAX_ENTRIES,
+    )
+
+
+def get_task_cache() -> Optional[ResultCache]:
+    """Process-wide per-task output cache, opened on first use (None when disabled)"""
+    return _open_task_cache() if TASK_CACHE_ENABLED else None
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from mining_agents.cache import SQLiteStore
+from mining_agents.settings import env_flag, process_singleton
+
+logger = logging.getLogger(__name__)
+
+# Task outputs of every run are saved as they finish, so a failed run can be resumed
+CHECKPOINTS_ENABLED = env_flag("EA_CHECKPOINTS_ENABLED", True)
+DEFAULT_CHECKPOINT_PATH = os.getenv("EA_CHECKPOINT_PATH", os.path.join("output", "ea_checkpoints.sqlite3"))
+# Runs, finished or not, are forgotten after this long
+DEFAULT_CHECKPOINT_TTL_SECONDS = int(os.getenv("EA_CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+class CheckpointStore(SQLiteStore):
+    """Durable per-task outputs of crew runs, so a failed run can resume where it stopped.
+
+    A run is registered with its kickoff inputs under a run id, and every task output is
+    written as soon as the task finishes. Resuming the run id replays the saved outputs
+    and only executes the tasks that never completed. Once a run completes its task
+    outputs are dropped; the run itself is kept until ``ttl_seconds`` so it is not
+    resumed twice. Backed by SQLite, so checkpoints survive a crash or restart and may be
+    shared by several worker processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, ttl_seconds: int = DEFAULT_CHECKPOINT_TTL_SECONDS):
+        super().__init__(path)
+        self.ttl_seconds = ttl_seconds
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                inputs TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                completed_at REAL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS task_outputs (
+                run_id TEXT NOT NULL,
+                task_name TEXT NOT NULL,
+                output TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (run_id, task_name)
+            )"""
+        )
+        logger.info(f"Checkpoint store at {path} (ttl {ttl_seconds}s)")
+
+    def start_run(self, run_id: str, inputs: Dict[str, Any]) -> None:
+        """Register a run; a resumed run keeps the inputs it was first started with"""
+        with self._lock:
+            self._prune()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, inputs, created_at) VALUES (?, ?, ?)",
+                (run_id, json.dumps(inputs), time.time()),
+            )
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """The run's inputs, whether it completed and which tasks are checkpointed, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT inputs, created_at, completed_at FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            tasks = [name for (name,) in self._conn.execute(
+                "SELECT task_name FROM task_outputs WHERE run_id = ? ORDER BY created_at", (run_id,)
+            )]
+        inputs, created_at, completed_at = row
+        return {
+            'run_id': run_id,
+            'inputs': json.loads(inputs),
+            'created_at': created_at,
+            'completed': completed_at is not None,
+            'tasks': tasks,
+        }
+
+    def save_task(self, run_id: str, task_name: str, output: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO task_outputs (run_id, task_name, output, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, task_name, json.dumps(output), time.time()),
+            )
+
+    def task_outputs(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """Saved output of every task of the run that finished, by task name"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_name, output FROM task_outputs WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {task_name: json.loads(output) for task_name, output in rows}
+
+    def complete_run(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE runs SET completed_at = ? WHERE run_id = ?", (time.time(), run_id))
+            self._conn.execute("DELETE FROM task_outputs WHERE run_id = ?", (run_id,))
+
+    def _prune(self) -> None:
+        """Drop runs older than the TTL with their outputs. Caller must hold the lock."""
+        cutoff = time.time() - self.ttl_seconds
+        self._conn.execute(
+            "DELETE FROM task_outputs WHERE run_id IN (SELECT run_id FROM runs WHERE created_at < ?)", (cutoff,)
+        )
+        self._conn.execute("DELETE FROM runs WHERE created_at < ?", (cutoff,))
+
+
+@process_singleton
+def _open_checkpoint_store() -> CheckpointStore:
+    return CheckpointStore()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Process-wide checkpoint store, opened on first use (None when disabled)"""
+    return _open_checkpoint_store() if CHECKPOINTS_ENABLED else None
@@ -1,21 +1,50 @@
 import os
+import time
 import logging
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List, Dict, Any
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('app.log')
-    ]
-)
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from typing import List, Dict, Any, Callable, Optional
+from crewai.tasks.task_output import TaskOutput
+
+from mining_agents.cache import ResultCache, get_task_cache
+from mining_agents.checkpoints import CheckpointStore, get_checkpoint_store
+from mining_agents.knowledge import KnowledgeIndex, get_knowledge_index
+from mining_agents.prompt_batcher import PromptBatcher
+from mining_agents.log_config import VERBOSE, configure_logging
+from mining_agents.llm_client import install_shared_client
+from mining_agents.dag import critical_path, schedule_parallel, task_dependencies
+from mining_agents.metrics import LLM_TOKENS, TASK_DURATION, TASK_RETRIES, LLMCallStats, track_llm
+from mining_agents.rate_limiter import RATE_LIMIT_ENABLED, RateLimitedLLM, get_rate_limiter
+from mining_agents.rules import RULE_ENGINE_ENABLED, RuleSet, load_rules
+from mining_agents.schemas import STRUCTURED_OUTPUT_RETRIES, NextSteps, PDOutline, structured_output_guardrail
+from mining_agents.tasks import MemoizedTask, RuleTask, task_output_payload
+
+# Configure logging (EA_LOG_PROFILE selects the development or production setup)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# "parallel" runs tasks that only depend on earlier levels of the context graph concurrently,
+# "sequential" keeps CrewAI's one-task-at-a-time behaviour
+EXECUTION_MODES = ('parallel', 'sequential')
+DEFAULT_EXECUTION_MODE = os.getenv('EA_EXECUTION_MODE', 'parallel')
+
+# Tasks whose prompts differ only by the project parameters; a PromptBatcher may answer
+# them for several concurrent runs with one LLM request
+BATCHABLE_TASKS = ('project_intake_task', 'regulatory_check_task')
+
+# Tasks given reference excerpts from the knowledge index (regulations, territories) when
+# they call their LLM. The rule engine answers the regulatory check for every project and
+# the Indigenous Nation lookup for the regions in rules.yaml without one, so only the PD
+# outline gets excerpts on every run
+KNOWLEDGE_TASKS = ('regulatory_check_task', 'pd_outline_task', 'indigenous_nation_id_task')
+# Tasks whose descriptions interpolate every project parameter they read. The intake
+# summary they get as context only restates those parameters, so it is left out of their
+# task cache key and, for instance, a new project name alone does not re-run the
+# Indigenous Nation lookup
+SELF_CONTAINED_TASKS = ('regulatory_check_task', 'pd_outline_task', 'indigenous_nation_id_task')
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -34,12 +63,155 @@ class MiningAgents():
 
     agents: List[BaseAgent]
     tasks: List[Task]
-    output_base_dir: str = 'output'
+    output_base_dir: Optional[str] = 'output'
+    execution_mode: str = DEFAULT_EXECUTION_MODE
 
-    def __init__(self, output_base_dir: str):
+    def __init__(
+        self,
+        output_base_dir: Optional[str] = 'output',
+        execution_mode: Optional[str] = None,
+        task_cache: Optional[ResultCache] = None,
+        use_rules: bool = RULE_ENGINE_ENABLED,
+        on_task_complete: Optional[Callable[[str, TaskOutput], None]] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        knowledge_index: Optional[KnowledgeIndex] = None,
+    ):
         logger.info(f"Initializing MiningAgents with output_base_dir: {output_base_dir}")
+        # Directory the markdown files are written to, or None to keep task outputs in memory only
         self.output_base_dir = output_base_dir
+        self.execution_mode = execution_mode or DEFAULT_EXECUTION_MODE
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode '{self.execution_mode}', expected one of {EXECUTION_MODES}")
+        # Per-task output cache; tasks with unchanged prompts and context skip the LLM
+        self.task_cache = task_cache if task_cache is not None else get_task_cache()
+        # Durable task outputs of runs started with a run id, so a failed run can resume
+        self.checkpoint_store = checkpoint_store if checkpoint_store is not None else get_checkpoint_store()
+        # Checkpoint id of the current run, or None to run without checkpoints
+        self.run_id: Optional[str] = None
+        # Reference excerpts for KNOWLEDGE_TASKS, or None when disabled or knowledge/ is empty
+        self.knowledge_index = knowledge_index if knowledge_index is not None else get_knowledge_index()
+        # Lookup tables from config/rules.yaml that answer rule-based tasks without an LLM call
+        self.rules: Dict[str, RuleSet] = load_rules() if use_rules else {}
+        # Wall time in seconds per task name, filled in after kickoff
+        self.task_timings: Dict[str, Optional[float]] = {}
+        # Output of each task by task name, filled in after kickoff
+        self.task_outputs: Dict[str, TaskOutput] = {}
+        # Whether each task was served from the task cache, filled in after kickoff
+        self.task_cache_hits: Dict[str, bool] = {}
+        # Whether each task was answered by the rule engine, filled in after kickoff
+        self.task_rule_hits: Dict[str, bool] = {}
+        # Whether each task shared a batched LLM request with other runs, filled in after kickoff
+        self.task_batched: Dict[str, bool] = {}
+        # Whether each task replayed its output from the run's checkpoint, filled in after kickoff
+        self.task_resumed: Dict[str, bool] = {}
+        # Duration, LLM calls, tokens and retries per task name, filled in after kickoff
+        self.task_metrics: Dict[str, Dict[str, Any]] = {}
+        # Wall time in seconds of the last kickoff
+        self.run_wall_time: Optional[float] = None
+        # LLM requests made by each agent during the current kickoff, by agent name
+        self.llm_stats: Dict[str, LLMCallStats] = {}
+        self._kickoff_started_at: Optional[float] = None
+        # Called with (task name, output) as each task finishes, e.g. to stream results
+        self.on_task_complete = on_task_complete
+        # Every agent's LLM requests go through one process-wide keep-alive connection pool
+        install_shared_client()
+
+    def release(self) -> None:
+        """Drop the agents, tasks and crew CrewAI memoized for this instance.
+
+        ``@agent``, ``@task`` and ``@crew`` cache their results in a dict per decorated
+        method, keyed on ``self``, for the life of the process. A crew that will not run
+        again must be released, or it is never garbage collected.
+        """
+        methods = list(self._original_tasks.values()) + list(self._original_agents.values())
+        for cls in type(self).__mro__:
+            methods.extend(vars(cls).values())
+        for method in methods:
+            code = getattr(method, '__code__', None)
+            if code is None or 'cache' not in code.co_freevars or not method.__closure__:
+                continue
+            cache = method.__closure__[code.co_freevars.index('cache')].cell_contents
+            if isinstance(cache, dict):
+                for key in [key for key in list(cache) if key[0] and key[0][0] is self]:
+                    cache.pop(key, None)
+
+    def reset_run_state(
+        self,
+        on_task_complete: Optional[Callable[[str, TaskOutput], None]] = None,
+        prompt_batcher: Optional[PromptBatcher] = None,
+        run_id: Optional[str] = None,
+    ) -> None:
+        """Clear everything a previous kickoff left behind so a prebuilt crew can run again.
+
+        Agents, tasks and the crew itself are kept; only outputs, counters and token usage
+        are reset. Inputs are re-interpolated from the original templates at kickoff.
+        ``prompt_batcher`` is shared by the runs of one batch to merge their batchable tasks.
+        With a ``run_id`` every task output is checkpointed, and tasks already checkpointed
+        under that id by an earlier, failed attempt are replayed instead of run again.
+        """
+        self.on_task_complete = on_task_complete
+        self.run_id = run_id if self.checkpoint_store is not None else None
+        checkpoints = self.checkpoint_store.task_outputs(self.run_id) if self.run_id else {}
+        if checkpoints:
+            logger.info(f"Resuming run {self.run_id} with {len(checkpoints)} checkpointed tasks")
+        self.task_timings = {}
+        self.task_outputs = {}
+        self.task_cache_hits = {}
+        self.task_rule_hits = {}
+        self.task_batched = {}
+        self.task_resumed = {}
+        self.task_metrics = {}
+        self.run_wall_time = None
+        self._kickoff_started_at = None
+        for task_instance in self.tasks:
+            if task_instance.name in BATCHABLE_TASKS:
+                task_instance.prompt_batcher = prompt_batcher
+            task_instance.resume_from(checkpoints.get(task_instance.name))
+            task_instance.output = None
+            task_instance.start_time = None
+            task_instance.end_time = None
+            task_instance.retry_count = 0
+            task_instance.used_tools = 0
+            task_instance.tools_errors = 0
+            task_instance.delegations = 0
+            task_instance.processed_by_agents = set()
+        for agent_instance in self.agents:
+            agent_instance.tools_results = []
+            agent_instance._times_executed = 0
+            # Crew usage metrics are summed from the agents' token counters
+            agent_instance._token_process = TokenProcess()
+
+    def _agent_name(self, agent_instance: BaseAgent) -> str:
+        """Config key of an agent, e.g. next_steps_agent, used as its metrics label"""
+        for name, agent_config in self.agents_config.items():
+            if agent_config.get('role', '').strip() == agent_instance.role.strip():
+                return name
+        return agent_instance.role
+
+    def _track_llm_calls(self) -> None:
+        """Attribute each agent's LLM requests to its LLMCallStats for this kickoff"""
+        for agent_instance in self.agents:
+            name = self._agent_name(agent_instance)
+            stats = self.llm_stats.setdefault(name, LLMCallStats(agent=name))
+            stats.reset()
+            # Call events come from the provider LLM, not the rate limiting wrapper
+            track_llm(getattr(agent_instance.llm, 'wrapped', agent_instance.llm), stats)
 
+    def _limit_llm_calls(self) -> None:
+        """Route every agent's LLM calls through the process-wide RateLimiter"""
+        limiter = get_rate_limiter()
+        for agent_instance in self.agents:
+            if not isinstance(agent_instance.llm, RateLimitedLLM):
+                # Runs kicked off earlier go first when calls queue for the rate limit
+                agent_instance.llm = RateLimitedLLM(
+                    agent_instance.llm, limiter, priority=lambda: self._kickoff_started_at or time.perf_counter()
+                )
+
+    def _output_file(self, filename: str) -> Optional[str]:
+        """Path a task writes its markdown to, or None when file output is disabled"""
+        if self.output_base_dir is None:
+            return None
+        return prepend_slash(str(os.path.join(self.output_base_dir, filename)))
 
     # Learn more about YAML configuration files here:
     # Agents: https://docs.crewai.com/concepts/agents#yaml-configuration-recommended
@@ -50,7 +222,7 @@ class MiningAgents():
         logger.info("Creating project_intake_agent")
         return Agent(
             config=self.agents_config['project_intake_agent'], # type: ignore[index]
-            verbose=True
+            verbose=VERBOSE
         )
 
     @agent
@@ -58,7 +230,7 @@ class MiningAgents():
         logger.info("Creating regulatory_check_agent")
         return Agent(
             config=self.agents_config['regulatory_check_agent'], # type: ignore[index]
-            verbose=True
+            verbose=VERBOSE
         )
 
     @agent
@@ -66,7 +238,7 @@ class MiningAgents():
         logger.info("Creating pd_outline_agent")
         return Agent(
             config=self.agents_config['pd_outline_agent'], # type: ignore[index]
-            verbose=True
+            verbose=VERBOSE
         )
 
     @agent
@@ -74,7 +246,7 @@ class MiningAgents():
         logger.info("Creating indigenous_nation_id_agent")
         return Agent(
             config=self.agents_config['indigenous_nation_id_agent'], # type: ignore[index]
-            verbose=True
+            verbose=VERBOSE
         )
         
     @agent
@@ -82,71 +254,76 @@ class MiningAgents():
         logger.info("Creating next_steps_agent")
         return Agent(
             config=self.agents_config['next_steps_agent'], # type: ignore[index]
-            verbose=True
+            verbose=VERBOSE
         )
 
     @task
     def project_intake_task(self) -> Task:
         logger.info("Creating project_intake_task")
-        output_file = str(os.path.join(self.output_base_dir, 'project_parameters.md'))
-        output_file = prepend_slash(output_file)
+        output_file = self._output_file('project_parameters.md')
         logger.info(f"project_intake_task output file: {output_file}")
-        task_instance = Task(
+        task_instance = MemoizedTask(
+            task_cache=self.task_cache,
             config=self.tasks_config['project_intake_task'], # type: ignore[index]
             output_file=output_file,
-            callback=lambda output: logger.info("Project intake task completed\n%s", output)
+            callback=lambda output: self._task_completed('project_intake_task', "Project intake task completed", output)
         )
         return task_instance
 
     @task
     def regulatory_check_task(self) -> Task:
         logger.info("Creating regulatory_check_task")
-        output_file = str(os.path.join(self.output_base_dir, 'regulatory_check.md'))
-        output_file = prepend_slash(output_file)
+        output_file = self._output_file('regulatory_check.md')
         logger.info(f"regulatory_check_task output file: {output_file}")
-        task_instance = Task(
+        task_instance = RuleTask(
+            rule_set=self.rules.get('regulatory_check_task'),
+            task_cache=self.task_cache,
             config=self.tasks_config['regulatory_check_task'], # type: ignore[index]
             context=[self.project_intake_task()],
             output_file=output_file,
-            callback=lambda output: logger.info("Regulatory check task completed\n%s", output)
+            callback=lambda output: self._task_completed('regulatory_check_task', "Regulatory check task completed", output)
         )
         return task_instance
 
     @task
     def pd_outline_task(self) -> Task:
         logger.info("Creating pd_outline_task")
-        output_file = str(os.path.join(self.output_base_dir, 'pd_outline.md'))
-        output_file = prepend_slash(output_file)
+        output_file = self._output_file('pd_outline.json')
         logger.info(f"pd_outline_task output file: {output_file}")
-        task_instance = Task(
+        task_instance = MemoizedTask(
+            task_cache=self.task_cache,
             config=self.tasks_config['pd_outline_task'], # type: ignore[index]
             context=[self.project_intake_task()],
+            output_pydantic=PDOutline,
+            guardrail=structured_output_guardrail(PDOutline),
+            max_retries=STRUCTURED_OUTPUT_RETRIES,
             output_file=output_file,
-            callback=lambda output: logger.info("Project description outline task completed\n%s", output)
+            callback=lambda output: self._task_completed('pd_outline_task', "Project description outline task completed", output)
         )
         return task_instance
 
     @task
     def indigenous_nation_id_task(self) -> Task:
         logger.info("Creating indigenous_nation_id_task")
-        output_file = str(os.path.join(self.output_base_dir, 'indigenous_nations.md'))
-        output_file = prepend_slash(output_file)
+        output_file = self._output_file('indigenous_nations.md')
         logger.info(f"indigenous_nation_id_task output file: {output_file}")
-        task_instance = Task(
+        task_instance = RuleTask(
+            rule_set=self.rules.get('indigenous_nation_id_task'),
+            task_cache=self.task_cache,
             config=self.tasks_config['indigenous_nation_id_task'], # type: ignore[index]
             context=[self.project_intake_task()],
             output_file=output_file,
-            callback=lambda output: logger.info("Indigenous nation identification task completed\n%s", output)
+            callback=lambda output: self._task_completed('indigenous_nation_id_task', "Indigenous nation identification task completed", output)
         )
         return task_instance
         
     @task
     def next_steps_task(self) -> Task:
         logger.info("Creating next_steps_task")
-        output_file = str(os.path.join(self.output_base_dir, 'next_steps.md'))
-        output_file = prepend_slash(output_file)
+        output_file = self._output_file('next_steps.json')
         logger.info(f"next_steps_task output file: {output_file}")
-        task_instance = Task(
+        task_instance = MemoizedTask(
+            task_cache=self.task_cache,
             config=self.tasks_config['next_steps_task'], # type: ignore[index]
             context=[
                 self.project_intake_task(),
@@ -154,27 +331,143 @@ class MiningAgents():
                 self.pd_outline_task(),
                 self.indigenous_nation_id_task()
             ],
+            output_pydantic=NextSteps,
+            guardrail=structured_output_guardrail(NextSteps),
+            max_retries=STRUCTURED_OUTPUT_RETRIES,
             output_file=output_file,
-            callback=lambda output: logger.info("Next steps task completed\n%s", output)
+            callback=lambda output: self._task_completed('next_steps_task', "Next steps task completed", output)
         )
         return task_instance
 
+    def _task_completed(self, task_name: str, message: str, output: TaskOutput) -> None:
+        logger.info(message)
+        # Full outputs only when debugging; they are returned and cached anyway
+        logger.debug("%s output:\n%s", task_name, output)
+        if self.run_id is not None:
+            try:
+                self.checkpoint_store.save_task(self.run_id, task_name, task_output_payload(output))
+            except Exception as e:
+                # Losing a checkpoint only costs a re-run of this task on resume
+                logger.warning(f"Could not checkpoint {task_name} of run {self.run_id}: {str(e)}", exc_info=True)
+        if self.on_task_complete is None:
+            return
+        try:
+            self.on_task_complete(task_name, output)
+        except Exception as e:
+            # A failing listener must never fail the crew run
+            logger.warning(f"on_task_complete listener failed for {task_name}: {str(e)}", exc_info=True)
+
     @crew
     def crew(self) -> Crew:
         """Creates the Mining Agents crew for EA scoping"""
-        # To learn how to add knowledge sources to your crew, check out the documentation:
-        # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
+        # knowledge/ is served from the local KnowledgeIndex rather than CrewAI knowledge
+        # sources, which need an embedding provider and rewrite every query with an LLM call
         logger.info("Creating Mining Agents crew")
         try:
-            logger.info(f"Configuring crew with {len(self.agents)} agents and {len(self.tasks)} tasks")
+            logger.info(f"Configuring crew with {len(self.agents)} agents and {len(self.tasks)} tasks ({self.execution_mode})")
+            tasks = self.tasks # Automatically created by the @task decorator
+            if self.execution_mode == 'parallel':
+                # Schedule from the declared context dependencies so independent tasks run concurrently
+                tasks = schedule_parallel(tasks)
+            for task_instance in self.tasks:
+                task_instance.cache_context = task_instance.name not in SELF_CONTAINED_TASKS
+            if self.knowledge_index is not None:
+                for task_instance in self.tasks:
+                    if task_instance.name in KNOWLEDGE_TASKS:
+                        task_instance.knowledge_index = self.knowledge_index
+            if RATE_LIMIT_ENABLED:
+                self._limit_llm_calls()
             crew_instance = Crew(
                 agents=self.agents, # Automatically created by the @agent decorator
-                tasks=self.tasks, # Automatically created by the @task decorator
+                tasks=tasks,
                 process=Process.sequential,
-                verbose=True,
+                verbose=VERBOSE,
             )
             logger.info("Mining Agents crew created successfully")
             return crew_instance
         except Exception as e:
             logger.error(f"Error creating Mining Agents crew: {str(e)}", exc_info=True)
             raise
+
+    @before_kickoff
+    def mark_kickoff_start(self, inputs):
+        if self.run_id is not None:
+            self.checkpoint_store.start_run(self.run_id, inputs)
+        self._track_llm_calls()
+        self._kickoff_started_at = time.perf_counter()
+        return inputs
+
+    @after_kickoff
+    def record_task_timings(self, result):
+        """Record per-task wall time and compare the critical path with the sequential total"""
+        self.task_outputs = {task.name: task.output for task in self.tasks if task.output is not None}
+        self.task_timings = {task.name: task.execution_duration for task in self.tasks}
+        self.task_cache_hits = {task.name: getattr(task, 'cache_hit', False) for task in self.tasks}
+        self.task_rule_hits = {task.name: getattr(task, 'rule_hit', False) for task in self.tasks}
+        self.task_batched = {task.name: getattr(task, 'batched', False) for task in self.tasks}
+        self.task_resumed = {task.name: getattr(task, 'resumed', False) for task in self.tasks}
+        if self.run_id is not None:
+            self.checkpoint_store.complete_run(self.run_id)
+        total = sum(duration or 0.0 for duration in self.task_timings.values())
+        path_length, path = critical_path(self.task_timings, task_dependencies(self.tasks))
+        wall_time = time.perf_counter() - self._kickoff_started_at if self._kickoff_started_at else 0.0
+        self.run_wall_time = wall_time
+        self.task_metrics = {task.name: self._record_task_metrics(task) for task in self.tasks}
+        logger.info(
+            "Task timings: %s | wall %.2fs, sequential total %.2fs, critical path %.2fs (%s)",
+            ", ".join(f"{name}={duration or 0.0:.2f}s" for name, duration in self.task_timings.items()),
+            wall_time, total, path_length, " -> ".join(path)
+        )
+        logger.info(
+            "Task cache hits: %s | rule engine hits: %s | batched: %s | resumed: %s",
+            ", ".join(name for name, hit in self.task_cache_hits.items() if hit) or "none",
+            ", ".join(name for name, hit in self.task_rule_hits.items() if hit) or "none",
+            ", ".join(name for name, batched in self.task_batched.items() if batched) or "none",
+            ", ".join(name for name, resumed in self.task_resumed.items() if resumed) or "none"
+        )
+        return result
+
+    def _record_task_metrics(self, task_instance: Task) -> Dict[str, Any]:
+        """Export one task's duration, LLM usage and retries to /metrics and return them for the response"""
+        name = task_instance.name
+        agent_name = self._agent_name(task_instance.agent) if task_instance.agent else "none"
+        if self.task_resumed.get(name):
+            source = "checkpoint"
+        elif self.task_cache_hits.get(name):
+            source = "cache"
+        elif self.task_rule_hits.get(name):
+            source = "rule"
+        elif self.task_batched.get(name):
+            source = "batched"
+        else:
+            source = "llm"
+        usage = task_instance.agent._token_process.get_summary() if task_instance.agent else None
+        stats = self.llm_stats.get(agent_name)
+        # Guardrail re-runs of the task, agent retries after a tool error and task retries after a rate limit
+        retries = (
+            task_instance.retry_count
+            + (getattr(task_instance.agent, '_times_executed', 0) or 0)
+            + getattr(task_instance, 'rate_limit_retries', 0)
+        )
+        metrics = {
+            "agent": agent_name,
+            "source": source,
+            "duration": self.task_timings.get(name),
+            "llm_calls": stats.calls if stats else 0,
+            "llm_seconds": round(stats.seconds, 4) if stats else 0.0,
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": usage.completion_tokens if usage else 0,
+            "cached_prompt_tokens": usage.cached_prompt_tokens if usage else 0,
+            "retries": retries,
+        }
+        if metrics["duration"] is not None:
+            TASK_DURATION.observe(metrics["duration"], task=name, source=source)
+        if retries:
+            TASK_RETRIES.inc(retries, task=name)
+        if metrics["prompt_tokens"]:
+            LLM_TOKENS.inc(metrics["prompt_tokens"], agent=agent_name, kind="prompt")
+        if metrics["completion_tokens"]:
+            LLM_TOKENS.inc(metrics["completion_tokens"], agent=agent_name, kind="completion")
+        if metrics["cached_prompt_tokens"]:
+            LLM_TOKENS.inc(metrics["cached_prompt_tokens"], agent=agent_name, kind="cached_prompt")
+        return metrics
@@ -0,0 +1,118 @@
+import logging
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from crewai import Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+class ParallelTask(Task):
+    """Task that can safely run with ``async_execution``.
+
+    CrewAI only ever sets the result on an async task's future, so when the task raises
+    the next synchronous task waits for it forever. This passes the exception on, and
+    the crew fails like a sequential one would.
+    """
+
+    def _execute_task_async(
+        self,
+        agent: Optional[BaseAgent],
+        context: Optional[str],
+        tools: Optional[List[Any]],
+        future: Future,
+    ) -> None:
+        try:
+            result = self._execute_core(agent, context, tools)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        future.set_result(result)
+
+
+def task_dependencies(tasks: Sequence[Task]) -> Dict[str, List[str]]:
+    """Map each task name to the names of the tasks it depends on.
+
+    A task with a non-empty ``context`` depends on exactly those tasks. A task
+    without one gets every earlier task's output in a sequential crew, so it
+    depends on all tasks that come before it.
+    """
+    dependencies: Dict[str, List[str]] = {}
+    seen: List[str] = []
+    for task in tasks:
+        if not task.context:
+            dependencies[task.name] = list(seen)
+        else:
+            dependencies[task.name] = [context_task.name for context_task in task.context]
+        seen.append(task.name)
+    return dependencies
+
+
+def execution_levels(tasks: Sequence[Task]) -> List[List[Task]]:
+    """Group tasks into levels where every task only depends on earlier levels.
+
+    Tasks keep their declared order inside a level.
+    """
+    dependencies = task_dependencies(tasks)
+    names = {task.name for task in tasks}
+    level_of: Dict[str, int] = {}
+    for task in tasks:
+        upstream = [name for name in dependencies[task.name] if name in names]
+        missing = [name for name in upstream if name not in level_of]
+        if missing:
+            raise ValueError(f"Task '{task.name}' depends on tasks declared after it: {missing}")
+        level_of[task.name] = 1 + max((level_of[name] for name in upstream), default=-1)
+
+    levels: List[List[Task]] = [[] for _ in range(max(level_of.values(), default=-1) + 1)]
+    for task in tasks:
+        levels[level_of[task.name]].append(task)
+    return levels
+
+
+def schedule_parallel(tasks: Sequence[Task]) -> List[Task]:
+    """Order tasks by dependency level and flag independent ones for async execution.
+
+    CrewAI runs consecutive ``async_execution`` tasks concurrently and makes the
+    next synchronous task wait for all of them, so every level with more than one
+    task is marked async and the following level acts as the fan-in. The last
+    level stays synchronous because a crew may not end with several async tasks,
+    and so does any level with a task that is not a ParallelTask.
+    """
+    levels = execution_levels(tasks)
+    ordered: List[Task] = []
+    for index, level in enumerate(levels):
+        is_last = index == len(levels) - 1
+        run_async = len(level) > 1 and not is_last
+        if run_async and not all(isinstance(task, ParallelTask) for task in level):
+            logger.warning(f"Running level {index} sequentially: only a ParallelTask can report an async failure")
+            run_async = False
+        for task in level:
+            task.async_execution = run_async
+            ordered.append(task)
+        logger.debug(f"Level {index}: {[task.name for task in level]} ({'parallel' if run_async else 'sequential'})")
+    return ordered
+
+
+def critical_path(
+    durations: Dict[str, Optional[float]],
+    dependencies: Dict[str, List[str]],
+) -> Tuple[float, List[str]]:
+    """Return the length and task names of the longest duration-weighted dependency chain."""
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for name in dependencies:
+        upstream = [dep for dep in dependencies[name] if dep in finish]
+        slowest = max(upstream, key=lambda dep: finish[dep], default=None)
+        finish[name] = (finish[slowest] if slowest else 0.0) + (durations.get(name) or 0.0)
+        previous[name] = slowest
+
+    if not finish:
+        return 0.0, []
+    last = max(finish, key=lambda name: finish[name])
+    path: List[str] = []
+    node: Optional[str] = last
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return finish[last], list(reversed(path))
@@ -0,0 +1,95 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+from crewai.tasks.task_output import TaskOutput
+
+from mining_agents.crew import MiningAgents
+from mining_agents.metrics import CREW_RUN_DURATION
+from mining_agents.prompt_batcher import PromptBatcher
+
+logger = logging.getLogger(__name__)
+
+# Idle crews kept between runs; match EA_MAX_WORKERS so every worker can reuse one
+DEFAULT_POOL_SIZE = int(os.getenv("EA_CREW_POOL_SIZE", os.getenv("EA_MAX_WORKERS", "4")))
+
+
+class CrewFactory:
+    """Hands out prebuilt MiningAgents crews and takes them back for the next run.
+
+    Building a crew parses the YAML configs, loads the rule tables and validates five
+    agents and five tasks. The factory does that once per pooled crew and only resets
+    per-run state (outputs, counters, the task listener) on each checkout. Inputs are
+    applied by CrewAI at kickoff, so a crew can serve any project.
+
+    Each checked-out crew is used by one run at a time. Up to ``pool_size`` idle crews
+    are kept; extra crews built under a burst are released when their run ends. A crew
+    whose run raised is released instead of reused, since async tasks from that run may
+    still be executing. Releasing clears what CrewAI memoized for the crew, so it can be
+    garbage collected once those tasks finish.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, **crew_kwargs: Any):
+        if pool_size < 0:
+            raise ValueError("pool_size must not be negative")
+        self.pool_size = pool_size
+        # Passed to MiningAgents for every crew the factory builds
+        self.crew_kwargs = crew_kwargs
+        self._idle: List[MiningAgents] = []
+        self._lock = threading.Lock()
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Build crews up front so the first requests do not pay for construction."""
+        count = self.pool_size if count is None else min(count, self.pool_size)
+        while self.idle < count:
+            mining_agents = self._build()
+            with self._lock:
+                self._idle.append(mining_agents)
+        logger.info(f"CrewFactory warmed with {self.idle} crews")
+
+    @contextmanager
+    def acquire(
+        self,
+        on_task_complete: Optional[Callable[[str, TaskOutput], None]] = None,
+        prompt_batcher: Optional[PromptBatcher] = None,
+        run_id: Optional[str] = None,
+    ) -> Iterator[MiningAgents]:
+        """Check out a crew ready for one kickoff, returning it to the pool afterwards.
+
+        With a ``run_id`` the run is checkpointed, and resumed if it ran before.
+        """
+        with self._lock:
+            mining_agents = self._idle.pop() if self._idle else None
+        if mining_agents is None:
+            mining_agents = self._build()
+        mining_agents.reset_run_state(on_task_complete, prompt_batcher, run_id)
+
+        started = time.perf_counter()
+        try:
+            yield mining_agents
+        except BaseException:
+            CREW_RUN_DURATION.observe(time.perf_counter() - started, status="failed")
+            logger.debug("Discarding crew after a failed run")
+            mining_agents.release()
+            raise
+        CREW_RUN_DURATION.observe(time.perf_counter() - started, status="completed")
+        mining_agents.reset_run_state()
+        with self._lock:
+            pooled = len(self._idle) < self.pool_size
+            if pooled:
+                self._idle.append(mining_agents)
+        if not pooled:
+            mining_agents.release()
+
+    def _build(self) -> MiningAgents:
+        mining_agents = MiningAgents(**self.crew_kwargs)
+        # Agents and tasks are created (and memoized) together with the crew
+        mining_agents.crew()
+        return mining_agents
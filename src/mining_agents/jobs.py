@@ -0,0 +1,169 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from mining_agents.metrics import JOB_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+# Crews running at once, runs waiting for a worker, and seconds a finished job stays queryable
+DEFAULT_MAX_WORKERS = int(os.getenv("EA_MAX_WORKERS", "4"))
+DEFAULT_MAX_QUEUE = int(os.getenv("EA_MAX_QUEUE", "16"))
+DEFAULT_JOB_TTL_SECONDS = int(os.getenv("EA_JOB_TTL_SECONDS", "3600"))
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another run."""
+
+
+class JobRunningError(Exception):
+    """Raised when a job id is reused while that job is still queued or running."""
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A single unit of work tracked by the JobManager."""
+    id: str
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    future: Future = field(default_factory=Future, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        """Seconds the job waited for a free worker, once it has started"""
+        return None if self.started_at is None else self.started_at - self.created_at
+
+
+class JobManager:
+    """Runs blocking callables on a bounded thread pool and keeps track of them by id.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more may wait
+    for a free worker. Submitting beyond that raises QueueFullError so callers can
+    apply backpressure instead of piling up work.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        job_ttl_seconds: int = DEFAULT_JOB_TTL_SECONDS,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.job_ttl_seconds = job_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ea-job")
+        self._jobs: Dict[str, Job] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        logger.info(f"JobManager started with {max_workers} workers and queue depth {max_queue}")
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def submit(self, fn: Callable[..., Any], *args, job_id: Optional[str] = None, **kwargs) -> Job:
+        """Queue ``fn(*args, **kwargs)`` and return its Job, or raise QueueFullError.
+
+        ``job_id`` picks the id instead of a random one. A finished job with that id is
+        replaced; one still queued or running raises JobRunningError.
+        """
+        with self._lock:
+            self._prune_finished()
+            existing = self._jobs.get(job_id) if job_id else None
+            if existing is not None and not existing.done:
+                raise JobRunningError(f"Job {job_id} is still {existing.status.value}")
+            if self._in_flight >= self.capacity:
+                raise QueueFullError(
+                    f"Job queue is full ({self._in_flight} running or queued, capacity {self.capacity})"
+                )
+            self._in_flight += 1
+            job = Job(id=job_id or uuid.uuid4().hex)
+            self._jobs[job.id] = job
+
+        try:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+        except RuntimeError:
+            # Executor already shut down
+            with self._lock:
+                self._in_flight -= 1
+                self._jobs.pop(job.id, None)
+            raise
+        logger.debug(f"Queued job {job.id} ({self._in_flight}/{self.capacity} in flight)")
+        return job
+
+    def add_completed(self, result: Any) -> Job:
+        """Register a job whose result is already known, e.g. one served from a cache."""
+        now = time.time()
+        job = Job(id=uuid.uuid4().hex, status=JobStatus.COMPLETED, started_at=now, finished_at=now, result=result)
+        job.future.set_result(result)
+        with self._lock:
+            self._prune_finished()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        logger.info("Shutting down JobManager")
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        JOB_QUEUE_WAIT.observe(job.started_at - job.created_at)
+        logger.info(f"Job {job.id} started after {job.started_at - job.created_at:.2f}s in queue")
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = JobStatus.COMPLETED
+            job.future.set_result(job.result)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            job.future.set_exception(e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._in_flight -= 1
+            logger.info(f"Job {job.id} finished with status {job.status.value} in {job.finished_at - job.started_at:.2f}s")
+
+    def _prune_finished(self) -> None:
+        """Forget finished jobs older than the TTL. Caller must hold the lock."""
+        cutoff = time.time() - self.job_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
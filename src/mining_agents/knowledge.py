@@ -0,0 +1,352 @@
+import os
+import re
+import json
+import math
+import mmap
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mining_agents.settings import env_flag, process_singleton
+
+logger = logging.getLogger(__name__)
+
+# Reference excerpts retrieved for the tasks' LLM prompts
+KNOWLEDGE_ENABLED = env_flag("EA_KNOWLEDGE_ENABLED", True)
+# Reference documents, as for CrewAI's knowledge sources
+DEFAULT_KNOWLEDGE_DIR = os.getenv("EA_KNOWLEDGE_DIR", "knowledge")
+DEFAULT_KNOWLEDGE_INDEX_PATH = os.getenv("EA_KNOWLEDGE_INDEX_PATH", os.path.join("output", "ea_knowledge_index"))
+# Excerpts added to a task's context at most, and their combined size in estimated tokens
+KNOWLEDGE_TOP_K = int(os.getenv("EA_KNOWLEDGE_TOP_K", "3"))
+KNOWLEDGE_MAX_TOKENS = int(os.getenv("EA_KNOWLEDGE_MAX_TOKENS", "600"))
+# Excerpts scoring lower than this are left out, however few match
+KNOWLEDGE_MIN_SCORE = float(os.getenv("EA_KNOWLEDGE_MIN_SCORE", "1.0"))
+CHUNK_WORDS = int(os.getenv("EA_KNOWLEDGE_CHUNK_WORDS", "200"))
+CHUNK_OVERLAP_WORDS = int(os.getenv("EA_KNOWLEDGE_CHUNK_OVERLAP_WORDS", "40"))
+
+# Bump to rebuild indexes written in an older layout
+INDEX_VERSION = 1
+KNOWLEDGE_EXTENSIONS = ('.txt', '.md')
+BM25_K1 = 1.2
+BM25_B = 0.75
+CHARS_PER_TOKEN = 4
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this to was were
+will with which who would should can could may must not no any all each such than then there these those
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; the same analysis for documents and queries"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text: str, chunk_words: int = CHUNK_WORDS, overlap_words: int = CHUNK_OVERLAP_WORDS) -> List[str]:
+    """Split a document into passages of about ``chunk_words`` words.
+
+    Paragraphs are kept together while they fit; a longer paragraph is cut into windows
+    overlapping by ``overlap_words`` so a sentence on a boundary is found in either.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        if not words:
+            continue
+        if current and len(current) + len(words) > chunk_words:
+            chunks.append(" ".join(current))
+            current = []
+        if len(words) <= chunk_words:
+            current.extend(words)
+            continue
+        step = max(1, chunk_words - overlap_words)
+        for start in range(0, len(words), step):
+            chunks.append(" ".join(words[start:start + chunk_words]))
+            if start + chunk_words >= len(words):
+                break
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def knowledge_files(directory: str) -> List[Path]:
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    return sorted(path for path in root.rglob("*") if path.is_file() and path.suffix.lower() in KNOWLEDGE_EXTENSIONS)
+
+
+def knowledge_fingerprint(directory: str, chunk_words: int = CHUNK_WORDS, overlap_words: int = CHUNK_OVERLAP_WORDS) -> str:
+    """Hash of the knowledge files' names, sizes and modification times and the chunking settings"""
+    entries = []
+    for path in knowledge_files(directory):
+        stat = path.stat()
+        entries.append([path.relative_to(directory).as_posix(), stat.st_size, stat.st_mtime_ns])
+    payload = {'version': INDEX_VERSION, 'chunk_words': chunk_words, 'overlap_words': overlap_words, 'files': entries}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class KnowledgeSnippet:
+    source: str
+    text: str
+    score: float
+
+
+class KnowledgeIndex:
+    """BM25 index over chunked knowledge files, memory-mapped from disk.
+
+    ``build`` chunks every ``.txt`` and ``.md`` file under the knowledge directory and
+    writes the postings, chunk lengths and chunk text as flat arrays. Opening an index
+    maps those files instead of reading them, so it costs the same however large the
+    knowledge base is, and processes using the same index share its pages. A query only
+    touches the postings of its own terms and the text of the chunks it returns.
+    Lexical scoring needs no embedding model, so the index is built and searched offline.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as f:
+            # term -> [first, end) slice of the postings
+            self._vocabulary: Dict[str, List[int]] = json.load(f)
+        self._postings = np.load(os.path.join(path, "postings.npy"), mmap_mode="r")
+        self._frequencies = np.load(os.path.join(path, "frequencies.npy"), mmap_mode="r")
+        self._lengths = np.load(os.path.join(path, "lengths.npy"), mmap_mode="r")
+        self._offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self._chunk_sources = np.load(os.path.join(path, "chunk_sources.npy"), mmap_mode="r")
+        self._text: Optional[mmap.mmap] = None
+        with open(os.path.join(path, "chunks.txt"), "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def chunks(self) -> int:
+        return self.manifest['chunks']
+
+    @property
+    def fingerprint(self) -> str:
+        return self.manifest['fingerprint']
+
+    @classmethod
+    def build(
+        cls,
+        directory: str = DEFAULT_KNOWLEDGE_DIR,
+        path: str = DEFAULT_KNOWLEDGE_INDEX_PATH,
+        chunk_words: int = CHUNK_WORDS,
+        overlap_words: int = CHUNK_OVERLAP_WORDS,
+    ) -> "KnowledgeIndex":
+        """Index the knowledge files and write the index to ``path``, replacing any older one"""
+        started = time.perf_counter()
+        fingerprint = knowledge_fingerprint(directory, chunk_words, overlap_words)
+        sources: List[str] = []
+        chunk_sources: List[int] = []
+        lengths: List[int] = []
+        offsets: List[int] = [0]
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".knowledge-", dir=parent)
+        try:
+            with open(os.path.join(staging, "chunks.txt"), "wb") as text_file:
+                for source, chunk in cls._read_chunks(directory, chunk_words, overlap_words):
+                    if not sources or sources[-1] != source:
+                        sources.append(source)
+                    chunk_id = len(lengths)
+                    tokens = tokenize(chunk)
+                    for term, frequency in Counter(tokens).items():
+                        postings.setdefault(term, []).append((chunk_id, frequency))
+                    encoded = chunk.encode("utf-8")
+                    text_file.write(encoded)
+                    offsets.append(offsets[-1] + len(encoded))
+                    lengths.append(len(tokens))
+                    chunk_sources.append(len(sources) - 1)
+
+            # One run of (chunk id, frequency) pairs per term, terms in sorted order
+            vocabulary: Dict[str, List[int]] = {}
+            chunk_ids: List[int] = []
+            frequencies: List[int] = []
+            for term in sorted(postings):
+                entries = postings[term]
+                vocabulary[term] = [len(chunk_ids), len(chunk_ids) + len(entries)]
+                chunk_ids.extend(chunk_id for chunk_id, _ in entries)
+                frequencies.extend(frequency for _, frequency in entries)
+
+            np.save(os.path.join(staging, "postings.npy"), np.asarray(chunk_ids, dtype=np.uint32))
+            np.save(os.path.join(staging, "frequencies.npy"),
+                    np.minimum(np.asarray(frequencies, dtype=np.int64), np.iinfo(np.uint16).max).astype(np.uint16))
+            np.save(os.path.join(staging, "lengths.npy"), np.asarray(lengths, dtype=np.uint32))
+            np.save(os.path.join(staging, "offsets.npy"), np.asarray(offsets, dtype=np.uint64))
+            np.save(os.path.join(staging, "chunk_sources.npy"), np.asarray(chunk_sources, dtype=np.uint32))
+            with open(os.path.join(staging, "vocabulary.json"), "w", encoding="utf-8") as f:
+                json.dump(vocabulary, f)
+            manifest = {
+                'version': INDEX_VERSION,
+                'fingerprint': fingerprint,
+                'directory': os.path.abspath(directory),
+                'sources': sources,
+                'chunks': len(lengths),
+                'average_length': (sum(lengths) / len(lengths)) if lengths else 0.0,
+                'chunk_words': chunk_words,
+                'overlap_words': overlap_words,
+                'built_at': time.time(),
+            }
+            # Written last: an index directory without a manifest is incomplete
+            with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        try:
+            cls._replace(staging, path)
+        except OSError:
+            # Another process swapped in its own build at the same moment; use that one
+            shutil.rmtree(staging, ignore_errors=True)
+        logger.info(
+            f"Indexed {len(lengths)} knowledge chunks from {len(sources)} files into {path} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return cls(path)
+
+    @staticmethod
+    def _read_chunks(directory: str, chunk_words: int, overlap_words: int) -> Iterator[Tuple[str, str]]:
+        for file_path in knowledge_files(directory):
+            try:
+                text = file_path.read_text(encoding="utf-8", errors="replace")
+            except OSError as e:
+                logger.warning(f"Skipping knowledge file {file_path}: {str(e)}")
+                continue
+            source = file_path.relative_to(directory).as_posix()
+            for chunk in chunk_text(text, chunk_words, overlap_words):
+                yield source, chunk
+
+    @staticmethod
+    def _replace(staging: str, path: str) -> None:
+        """Swap the new index in; processes that mapped the old one keep reading its unlinked files"""
+        if os.path.isdir(path):
+            retired = tempfile.mkdtemp(prefix=".knowledge-old-", dir=os.path.dirname(os.path.abspath(path)))
+            os.rename(path, os.path.join(retired, "index"))
+            os.rename(staging, path)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.rename(staging, path)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = KNOWLEDGE_TOP_K,
+        max_tokens: int = KNOWLEDGE_MAX_TOKENS,
+        min_score: float = KNOWLEDGE_MIN_SCORE,
+    ) -> List[KnowledgeSnippet]:
+        """The best matching chunks for ``query``, at most ``top_k`` and ``max_tokens`` in total"""
+        chunk_count = self.chunks
+        if not chunk_count or top_k <= 0:
+            return []
+        average_length = self.manifest['average_length'] or 1.0
+        scores = np.zeros(chunk_count, dtype=np.float32)
+        for term in set(tokenize(query)):
+            span = self._vocabulary.get(term)
+            if span is None:
+                continue
+            first, end = span
+            chunk_ids = self._postings[first:end]
+            frequencies = self._frequencies[first:end].astype(np.float32)
+            idf = math.log(1.0 + (chunk_count - (end - first) + 0.5) / ((end - first) + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._lengths[chunk_ids] / average_length)
+            scores[chunk_ids] += idf * frequencies * (BM25_K1 + 1.0) / (frequencies + norm)
+
+        candidates = np.flatnonzero(scores >= max(min_score, np.finfo(np.float32).tiny))
+        if not len(candidates):
+            return []
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        snippets: List[KnowledgeSnippet] = []
+        budget = max_tokens * CHARS_PER_TOKEN
+        for chunk_id in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            text = self._chunk_text(int(chunk_id))
+            if len(text) > budget:
+                continue
+            budget -= len(text)
+            source = self.manifest['sources'][int(self._chunk_sources[chunk_id])]
+            snippets.append(KnowledgeSnippet(source=source, text=text, score=float(scores[chunk_id])))
+        return snippets
+
+    def _chunk_text(self, chunk_id: int) -> str:
+        start, end = int(self._offsets[chunk_id]), int(self._offsets[chunk_id + 1])
+        return self._text[start:end].decode("utf-8") if self._text is not None else ""
+
+    def close(self) -> None:
+        if self._text is not None:
+            self._text.close()
+            self._text = None
+
+
+def format_snippets(snippets: List[KnowledgeSnippet]) -> str:
+    """Excerpts as appended to a task's context"""
+    excerpts = "\n\n".join(f"[{snippet.source}] {snippet.text}" for snippet in snippets)
+    return f"Reference excerpts from the knowledge base:\n{excerpts}"
+
+
+def load_knowledge_index(
+    directory: str = DEFAULT_KNOWLEDGE_DIR,
+    path: str = DEFAULT_KNOWLEDGE_INDEX_PATH,
+) -> KnowledgeIndex:
+    """Open the index at ``path``, building it first if it is missing or the knowledge files changed"""
+    fingerprint = knowledge_fingerprint(directory)
+    try:
+        index = KnowledgeIndex(path)
+        if index.manifest.get('version') == INDEX_VERSION and index.fingerprint == fingerprint:
+            return index
+        index.close()
+        logger.info("Knowledge files changed, rebuilding the knowledge index")
+    except (OSError, ValueError, KeyError):
+        logger.info(f"No usable knowledge index at {path}, building it")
+    return KnowledgeIndex.build(directory, path)
+
+
+# Tried once per process; changed knowledge files are picked up on restart
+@process_singleton
+def _open_knowledge_index() -> Optional[KnowledgeIndex]:
+    if not knowledge_files(DEFAULT_KNOWLEDGE_DIR):
+        return None
+    try:
+        index = load_knowledge_index()
+    except Exception as e:
+        logger.warning(f"Knowledge index unavailable, running without it: {str(e)}")
+        return None
+    return index if index.chunks else None
+
+
+def get_knowledge_index() -> Optional[KnowledgeIndex]:
+    """The knowledge index shared by every crew in the process (None when disabled or empty)"""
+    return _open_knowledge_index() if KNOWLEDGE_ENABLED else None
+
+
+def build():
+    """
+    Build the knowledge index ahead of time, e.g. in a container image.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Index the knowledge files for retrieval")
+    parser.add_argument('--directory', default=DEFAULT_KNOWLEDGE_DIR, help="Directory of .txt and .md knowledge files")
+    parser.add_argument('--output', default=DEFAULT_KNOWLEDGE_INDEX_PATH, help="Directory the index is written to")
+    args = parser.parse_args()
+    index = KnowledgeIndex.build(args.directory, args.output)
+    print(f"Indexed {index.chunks} chunks from {len(index.manifest['sources'])} files into {args.output}")
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,90 @@
+import os
+import logging
+import threading
+from typing import Optional
+
+import httpx
+
+from mining_agents.settings import env_flag
+
+logger = logging.getLogger(__name__)
+
+# Connections to the LLM provider shared by every agent of every crew in the process that
+# talks to an OpenAI-compatible or Azure OpenAI endpoint; LiteLLM's other provider
+# handlers (Anthropic, Bedrock, Vertex AI, ...) keep their own clients and ignore it.
+# All LLM calls go to one provider host, so this is effectively the per-host limit.
+LLM_MAX_CONNECTIONS = int(os.getenv("EA_LLM_MAX_CONNECTIONS", "20"))
+# Idle seconds before a pooled connection is closed. httpx's default of 5s drops the
+# connection while an agent is still thinking, so the next call pays a new TLS handshake.
+LLM_KEEPALIVE_SECONDS = float(os.getenv("EA_LLM_KEEPALIVE_SECONDS", "120"))
+# Multiplex calls over one connection; needs the optional h2 package (httpx[http2])
+LLM_HTTP2 = env_flag("EA_LLM_HTTP2", False)
+LLM_TIMEOUT_SECONDS = float(os.getenv("EA_LLM_TIMEOUT_SECONDS", "600"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("EA_LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+
+_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def shared_http_client() -> httpx.Client:
+    """The process-wide keep-alive connection pool for LLM requests, created on first use"""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            import litellm
+
+            http2 = LLM_HTTP2 and _http2_available()
+            if LLM_HTTP2 and not http2:
+                logger.warning("EA_LLM_HTTP2 is set but h2 is not installed, LLM requests use HTTP/1.1")
+            _client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+                verify=litellm.ssl_verify,
+            )
+            logger.info(f"Created shared LLM HTTP client ({LLM_MAX_CONNECTIONS} connections, http2={http2})")
+        return _client
+
+
+def install_shared_client() -> httpx.Client:
+    """Make LiteLLM send OpenAI and Azure requests through the shared pool; safe to call repeatedly.
+
+    LiteLLM's OpenAI and Azure handlers build their SDK clients on
+    ``litellm.client_session`` when one is set. Clients it cached before hold their own
+    pools, so they are dropped once. Other providers' handlers never read it.
+    """
+    import litellm
+
+    client = shared_http_client()
+    if litellm.client_session is not client:
+        litellm.client_session = client
+        litellm.in_memory_llm_clients_cache.flush_cache()
+    return client
+
+
+def close_shared_client() -> None:
+    """Close the pooled connections, e.g. on API shutdown"""
+    global _client
+    import litellm
+
+    with _lock:
+        if _client is None:
+            return
+        if litellm.client_session is _client:
+            # Later requests fall back to LiteLLM's own clients instead of a closed pool
+            litellm.client_session = None
+            litellm.in_memory_llm_clients_cache.flush_cache()
+        _client.close()
+        _client = None
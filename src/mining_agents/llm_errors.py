@@ -0,0 +1,25 @@
+from typing import Optional
+
+# Nothing here imports CrewAI or LiteLLM, so the API can classify a failed run's error
+# without loading the crew stack
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether the provider rejected a request with a 429.
+
+    LiteLLM's ``RateLimitError`` (and the OpenAI SDK's, which it subclasses) is matched
+    by name, so checking an error never imports either library.
+    """
+    if any(cls.__name__ == "RateLimitError" for cls in type(error).__mro__):
+        return True
+    return getattr(error, "status_code", None) == 429
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from the Retry-After header of a 429"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,109 @@
+import os
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import List, Optional
+
+from mining_agents.settings import env_flag
+
+# "development" logs every record synchronously to the console and app.log and traces
+# agents verbosely; "production" is quiet: see configure_logging
+LOG_PROFILES = ('development', 'production')
+LOG_PROFILE = os.getenv('EA_LOG_PROFILE', 'development')
+# CrewAI's step-by-step agent and crew trace on stdout
+VERBOSE = env_flag('EA_VERBOSE', LOG_PROFILE != 'production')
+# Share of records below WARNING kept in production, e.g. 0.1 keeps one in ten
+LOG_SAMPLE_RATE = float(os.getenv('EA_LOG_SAMPLE_RATE', '1.0'))
+LOG_MAX_BYTES = int(os.getenv('EA_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv('EA_LOG_BACKUP_COUNT', '5'))
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps ``rate`` of the records below WARNING, evenly spread; warnings and errors always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError("EA_LOG_SAMPLE_RATE must be between 0 and 1")
+        self.rate = rate
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        with self._lock:
+            self._credit += self.rate
+            if self._credit >= 1.0:
+                self._credit -= 1.0
+                return True
+        return False
+
+
+def configure_logging(default_level: int = logging.INFO, log_file: Optional[str] = 'app.log') -> None:
+    """Set up root logging for the configured profile, unless it is already configured.
+
+    ``development`` keeps the original behaviour: records go straight to the console and
+    to ``log_file``. ``production`` defaults to WARNING, samples records below WARNING
+    with ``EA_LOG_SAMPLE_RATE`` and hands them to a QueueHandler, so a request thread never
+    waits on disk or the console. A background QueueListener writes them to the console and
+    to a size-rotated ``log_file``. ``EA_LOG_LEVEL`` overrides the level and ``EA_LOG_FILE``
+    the file, with an empty value meaning no file.
+    """
+    global _listener, _queue_handler
+    if LOG_PROFILE not in LOG_PROFILES:
+        raise ValueError(f"Unknown log profile '{LOG_PROFILE}', expected one of {LOG_PROFILES}")
+    production = LOG_PROFILE == 'production'
+    level = os.getenv('EA_LOG_LEVEL', logging.getLevelName(logging.WARNING if production else default_level)).upper()
+    log_file = os.getenv('EA_LOG_FILE', log_file or '') or None
+
+    with _lock:
+        root = logging.getLogger()
+        if root.handlers:
+            return
+        if not production:
+            handlers: List[logging.Handler] = [logging.StreamHandler()]
+            if log_file:
+                handlers.append(logging.FileHandler(log_file))
+            logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+            return
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            handlers.append(logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Flush what is still queued when the process exits
+        atexit.register(_listener.stop)
+
+
+def _restart_listener_after_fork() -> None:
+    """Give a forked worker its own log queue and listener thread; threads do not survive fork"""
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
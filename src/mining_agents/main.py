@@ -1,17 +1,31 @@
 #!/usr/bin/env python
 import sys
+import argparse
 import warnings
 import os
+import uuid
 from datetime import datetime
 import json
 
 from mining_agents.crew import MiningAgents
+from mining_agents.cache import CACHE_ENABLED, ResultCache, scoping_cache_key
+from mining_agents.checkpoints import get_checkpoint_store
+from mining_agents.batch import DEFAULT_BATCH_CONCURRENCY, BatchResult, run_batch
+from mining_agents.factory import CrewFactory
+from mining_agents.prompt_batcher import PROMPT_BATCHING_ENABLED, PromptBatcher
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 # Ensure the output directory exists
 os.makedirs('output', exist_ok=True)
 
+# Cached CLI runs store the final output plus every task's markdown file
+CACHE_NAMESPACE = "crew-output"
+# Cached batch runs store the final output plus every task's raw output
+BATCH_CACHE_NAMESPACE = "crew-batch"
+
+PROJECT_FIELDS = ('project_name', 'location_region', 'cobalt_type', 'scale')
+
 def get_user_input():
     """Get project parameters from user via CLI interaction"""
     print("\n=== Mining Project Environmental Assessment Scoping ===\n")
@@ -58,6 +72,11 @@ def run():
     """
     Run the mining agents crew for EA scoping.
     """
+    if sys.argv[1:2] == ['batch']:
+        return batch(sys.argv[2:])
+    if sys.argv[1:2] == ['resume']:
+        return resume(sys.argv[2:])
+
     # Ask if user wants to use mock data
     use_mock = input("\nUse mock data for demonstration? (y/n): ").lower().strip() == 'y'
     
@@ -74,14 +93,140 @@ def run():
         print(f"  - {key}: {value}")
     print("\nProcessing with agent crew...\n")
     
+    # Pass --no-cache to force a fresh crew run
+    bypass_cache = '--no-cache' in sys.argv[1:]
+    result_cache = ResultCache() if CACHE_ENABLED else None
+    cache_key = scoping_cache_key(inputs, CACHE_NAMESPACE) if result_cache else None
+
+    cached = result_cache.get(cache_key) if result_cache and not bypass_cache else None
+    if cached is not None:
+        print("(cache hit, no LLM calls made)")
+        for path, content in cached['files'].items():
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+        print("\n=== EA Scoping Results ===\n")
+        print(cached['raw'])
+        print("\nResults have been saved to the output directory.")
+        return
+
+    # Every task output is checkpointed, so a failed run can continue with `resume <run id>`
+    mining_agents = MiningAgents()
+    run_id = uuid.uuid4().hex
     try:
-        result = MiningAgents().crew().kickoff(inputs=inputs)
+        crew = mining_agents.crew()
+        # The tasks exist once the crew is built
+        mining_agents.reset_run_state(run_id=run_id)
+        result = crew.kickoff(inputs=inputs)
         print("\n=== EA Scoping Results ===\n")
         print(result.raw)
         print("\nResults have been saved to the output directory.")
     except Exception as e:
+        if mining_agents.run_id is not None:
+            print(f"\nContinue this run from its last completed task with: resume {run_id}")
         raise Exception(f"An error occurred while running the crew: {e}")
 
+    if result_cache:
+        files = {task.output_file: task.output.raw for task in crew.tasks if task.output_file and task.output}
+        result_cache.set(cache_key, {'raw': result.raw, 'files': files})
+
+
+def read_projects(path):
+    """Read project inputs from a JSONL file, returning (line number, inputs or error) per record"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                missing = [field for field in PROJECT_FIELDS if field not in record]
+                if missing:
+                    raise ValueError(f"missing {', '.join(missing)}")
+                records.append((line_number, {field: record[field] for field in PROJECT_FIELDS}))
+            except (ValueError, TypeError) as e:
+                records.append((line_number, f"Invalid project on line {line_number}: {e}"))
+    return records
+
+
+def batch(args=None):
+    """
+    Scope every project in a JSONL file, printing one JSON line per project as it finishes.
+    """
+    parser = argparse.ArgumentParser(prog='mining_agents batch', description=batch.__doc__.strip())
+    parser.add_argument('file', help="JSONL file with one project per line")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_BATCH_CONCURRENCY, help="projects scoped at the same time")
+    parser.add_argument('--no-cache', action='store_true', help="force a fresh crew run for every project")
+    parser.add_argument('--no-prompt-batching', action='store_true', help="send every project's intake and regulatory prompts separately")
+    # The crews log verbosely to stdout, so results can go to a file instead
+    parser.add_argument('--output', '-o', type=argparse.FileType('w'), default=sys.stdout, help="JSONL file to write results to (default: stdout)")
+    options = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    records = read_projects(options.file)
+    projects = [inputs for _, inputs in records if isinstance(inputs, dict)]
+    # Position of each valid project among all records, so indices match the file
+    positions = [index for index, (_, inputs) in enumerate(records) if isinstance(inputs, dict)]
+    for index, (_, inputs) in enumerate(records):
+        if not isinstance(inputs, dict):
+            print(BatchResult(index=index, input={}, status='failed', error=inputs).to_json(), file=options.output, flush=True)
+
+    # Task outputs stay in memory so concurrent projects never overwrite each other's files
+    crew_factory = CrewFactory(pool_size=options.concurrency, output_base_dir=None)
+    result_cache = ResultCache() if CACHE_ENABLED else None
+    # Projects running at the same time share LLM requests for their intake and regulatory tasks
+    prompt_batcher = PromptBatcher() if PROMPT_BATCHING_ENABLED and not options.no_prompt_batching else None
+
+    def scope(inputs):
+        cache_key = scoping_cache_key(inputs, BATCH_CACHE_NAMESPACE) if result_cache else None
+        cached = result_cache.get(cache_key) if result_cache and not options.no_cache else None
+        if cached is not None:
+            return cached
+        with crew_factory.acquire(prompt_batcher=prompt_batcher) as mining_agents:
+            result = mining_agents.crew().kickoff(inputs=inputs)
+            output = {
+                'raw': result.raw,
+                'tasks': {name: task_output.raw for name, task_output in mining_agents.task_outputs.items()},
+            }
+        if result_cache:
+            result_cache.set(cache_key, output)
+        return output
+
+    for batch_result in run_batch(projects, scope, max_concurrency=options.concurrency):
+        batch_result.index = positions[batch_result.index]
+        print(batch_result.to_json(), file=options.output, flush=True)
+    if prompt_batcher is not None and prompt_batcher.requests:
+        print(f"Merged {prompt_batcher.prompts} prompts into {prompt_batcher.requests} LLM requests", file=sys.stderr)
+
+
+def resume(args=None):
+    """
+    Continue a failed run from its last completed task, reusing the checkpointed outputs.
+    """
+    parser = argparse.ArgumentParser(prog='mining_agents resume', description=resume.__doc__.strip())
+    parser.add_argument('run_id', help="run id printed when the run failed, or the API job id")
+    options = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    checkpoint_store = get_checkpoint_store()
+    if checkpoint_store is None:
+        raise Exception("Checkpoints are disabled (EA_CHECKPOINTS_ENABLED=false)")
+    run = checkpoint_store.get_run(options.run_id)
+    if run is None:
+        raise Exception(f"No checkpoint for run {options.run_id}")
+    if run['completed']:
+        raise Exception(f"Run {options.run_id} already completed")
+    print(f"Resuming run {options.run_id} after {', '.join(run['tasks']) or 'no completed tasks'}")
+
+    mining_agents = MiningAgents()
+    try:
+        crew = mining_agents.crew()
+        mining_agents.reset_run_state(run_id=options.run_id)
+        result = crew.kickoff(inputs=run['inputs'])
+        print("\n=== EA Scoping Results ===\n")
+        print(result.raw)
+        print("\nResults have been saved to the output directory.")
+    except Exception as e:
+        raise Exception(f"An error occurred while resuming the crew: {e}")
+
 
 def train():
     """
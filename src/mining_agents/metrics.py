@@ -0,0 +1,232 @@
+import time
+import bisect
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; spans cache hits through slow multi-minute LLM answers
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in values]
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        super().__init__(name, documentation)
+        self._read = read
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {float(self._read())}"]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), then the sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                samples.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            samples.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            samples.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return samples
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+JOB_QUEUE_WAIT = registry.register(Histogram(
+    "ea_job_queue_wait_seconds", "Time a scoping job waited for a free worker"))
+CREW_RUN_DURATION = registry.register(Histogram(
+    "ea_crew_run_seconds", "Wall time of a full crew kickoff", ("status",)))
+TASK_DURATION = registry.register(Histogram(
+    "ea_task_duration_seconds", "Wall time of one task execution", ("task", "source")))
+TASK_RETRIES = registry.register(Counter(
+    "ea_task_retries_total", "Guardrail and agent error retries", ("task",)))
+LLM_CALL_DURATION = registry.register(Histogram(
+    "ea_llm_call_duration_seconds", "Latency of a single LLM request", ("agent",)))
+LLM_CALLS = registry.register(Counter(
+    "ea_llm_calls_total", "LLM requests by outcome", ("agent", "status")))
+LLM_TOKENS = registry.register(Counter(
+    "ea_llm_tokens_total", "LLM tokens used", ("agent", "kind")))
+LLM_RATE_LIMITED = registry.register(Counter(
+    "ea_llm_rate_limited_total", "LLM requests rejected by the provider's rate limit"))
+RATE_LIMIT_WAIT = registry.register(Histogram(
+    "ea_llm_rate_limit_wait_seconds", "Time an LLM request waited for the process-wide rate limiter"))
+REQUESTS_COALESCED = registry.register(Counter(
+    "ea_requests_coalesced_total", "Scoping requests answered by an identical run already in flight", ("endpoint",)))
+
+
+@dataclass
+class LLMCallStats:
+    """LLM requests made through one agent's LLM during the current run"""
+    agent: str
+    calls: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+
+# LLM instance -> stats of the agent that owns it; filled by track_llm
+_llm_stats: "weakref.WeakKeyDictionary[object, LLMCallStats]" = weakref.WeakKeyDictionary()
+_call_started = threading.local()
+_listeners_installed = False
+_install_lock = threading.Lock()
+
+
+def track_llm(llm: object, stats: LLMCallStats) -> None:
+    """Attribute the LLM requests made by ``llm`` to ``stats`` and the agent it names"""
+    install_llm_listeners()
+    try:
+        _llm_stats[llm] = stats
+    except TypeError:
+        logger.debug(f"Cannot track LLM calls of {type(llm).__name__} for {stats.agent}")
+
+
+def _on_llm_call_started(source: object, event: object) -> None:
+    started = getattr(_call_started, "started", None)
+    if started is None:
+        started = _call_started.started = {}
+    started[id(source)] = time.perf_counter()
+
+
+def _record_llm_call(source: object, failed: bool) -> None:
+    started = getattr(_call_started, "started", {}).pop(id(source), None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    stats = _llm_stats.get(source)
+    agent = stats.agent if stats is not None else "unknown"
+    LLM_CALL_DURATION.observe(duration, agent=agent)
+    LLM_CALLS.inc(agent=agent, status="failed" if failed else "completed")
+    if stats is not None:
+        stats.calls += 1
+        stats.failures += int(failed)
+        stats.seconds += duration
+
+
+def _on_llm_call_completed(source: object, event: object) -> None:
+    _record_llm_call(source, failed=False)
+
+
+def _on_llm_call_failed(source: object, event: object) -> None:
+    _record_llm_call(source, failed=True)
+
+
+def install_llm_listeners() -> None:
+    """Time every LLM request through the CrewAI event bus; safe to call repeatedly"""
+    global _listeners_installed
+    with _install_lock:
+        if _listeners_installed:
+            return
+        from crewai.utilities.events import crewai_event_bus
+        from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+
+        crewai_event_bus.register_handler(LLMCallStartedEvent, _on_llm_call_started)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, _on_llm_call_completed)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, _on_llm_call_failed)
+        _listeners_installed = True
+
+
+def render() -> str:
+    return registry.render()
+
+
+def add_gauge(name: str, documentation: str, read: Callable[[], float]) -> Optional[Gauge]:
+    """Register a gauge read at scrape time, e.g. the job queue depth"""
+    return registry.register(Gauge(name, documentation, read))
@@ -0,0 +1,107 @@
+import re
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "**" delimiters around section titles
+_BOLD_PATTERN = re.compile(r"\*\*")
+# "N. " step markers. The lookbehind anchors a marker to the start of its digit run,
+# so a long run of digits is scanned once instead of once per digit.
+_STEP_PATTERN = re.compile(r"(?<!\d)\d+\.\s+")
+# Blank lines and over-indented bullets, rewritten in one pass by clean_markdown
+_CLEANUP_PATTERN = re.compile(r"\n\n|\*   ")
+_CLEANUP_REPLACEMENTS = {"\n\n": "\n", "*   ": "* "}
+_NUMBERED_LINE_PREFIXES = ("1.", "2.", "3.")
+
+
+def tokenize(content: str, pattern: re.Pattern) -> List[Tuple[int, int]]:
+    """(start, end) of every non-overlapping match of ``pattern``, found in one left-to-right pass"""
+    return [match.span() for match in pattern.finditer(content)]
+
+
+def clean_markdown(content: str) -> str:
+    """Normalize line breaks and bullet points in a markdown section"""
+    return _CLEANUP_PATTERN.sub(lambda match: _CLEANUP_REPLACEMENTS[match.group()], content)
+
+
+def parse_pd_outline(pd_content: str) -> Dict[str, str]:
+    """Parse the project description outline into a {section title: content} dict.
+
+    Each ``**title**`` pair opens a section that runs until the next pair. A trailing
+    unpaired ``**`` stays part of the last section's content.
+    """
+    delimiters = tokenize(pd_content, _BOLD_PATTERN)
+    if len(delimiters) < 2:
+        logger.warning("No bold section headers in project description, falling back to line parsing")
+        return _parse_pd_outline_lines(pd_content)
+
+    sections = {}
+    logger.debug(f"Found {len(delimiters) // 2} sections in project description")
+    for index in range(0, len(delimiters) - 1, 2):
+        title_start, content_start = delimiters[index][1], delimiters[index + 1][1]
+        title = pd_content[title_start:delimiters[index + 1][0]]
+        # A section ends where the next complete **title** pair begins
+        has_next_pair = index + 3 < len(delimiters)
+        content_end = delimiters[index + 2][0] if has_next_pair else len(pd_content)
+        sections[title.strip()] = pd_content[content_start:content_end].strip()
+    return sections
+
+
+def _parse_pd_outline_lines(pd_content: str) -> Dict[str, str]:
+    """Sections from lines starting with ``**``, for outlines without bold pairs"""
+    sections = {}
+    current_section = None
+    content_lines: List[str] = []
+    for line in pd_content.split('\n'):
+        if line.startswith('**'):
+            if current_section and content_lines:
+                sections[current_section] = '\n'.join(content_lines)
+                content_lines = []
+            current_section = line.strip('*').strip()
+        elif line.strip() and current_section:
+            content_lines.append(line)
+    if current_section and content_lines:
+        sections[current_section] = '\n'.join(content_lines)
+    return sections
+
+
+def parse_next_steps(next_steps_content: str) -> List[Dict[str, str]]:
+    """Parse the numbered next steps into a list of {step, explanation} dicts.
+
+    Each ``N. `` marker starts a step: its first line is the step and the remaining
+    lines, joined with spaces, the explanation.
+    """
+    markers = tokenize(next_steps_content, _STEP_PATTERN)
+    next_steps = []
+    for index, (_, body_start) in enumerate(markers):
+        body_end = markers[index + 1][0] if index + 1 < len(markers) else len(next_steps_content)
+        lines = [line.strip() for line in next_steps_content[body_start:body_end].strip().split('\n')]
+        next_steps.append({
+            "step": lines[0],
+            "explanation": ' '.join(lines[1:]),
+        })
+    if not next_steps:
+        next_steps = _parse_next_steps_lines(next_steps_content)
+    return next_steps
+
+
+def _parse_next_steps_lines(next_steps_content: str) -> List[Dict[str, str]]:
+    """Steps from lines starting with ``1.``-``3.``, for markers without a following space"""
+    next_steps = []
+    current_step = None
+    explanation_lines: List[str] = []
+    for line in next_steps_content.split('\n'):
+        if not line.strip():
+            continue
+        if line.startswith(_NUMBERED_LINE_PREFIXES):
+            if current_step and explanation_lines:
+                next_steps.append({"step": current_step, "explanation": ' '.join(explanation_lines)})
+                explanation_lines = []
+            parts = line.split('.', 1)
+            current_step = parts[1].strip() if len(parts) > 1 else line.strip()
+        elif current_step:
+            explanation_lines.append(line.strip())
+    if current_step and explanation_lines:
+        next_steps.append({"step": current_step, "explanation": ' '.join(explanation_lines)})
+    return next_steps
@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from mining_agents.settings import env_flag
+
+if TYPE_CHECKING:
+    # Only for annotations, so the API can import this module without loading CrewAI
+    from crewai import Task
+    from crewai.agents.agent_builder.base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+# Merge batchable tasks across the projects of a batch run
+PROMPT_BATCHING_ENABLED = env_flag("EA_PROMPT_BATCHING_ENABLED", True)
+# How long the first prompt of a batch waits for matching prompts from other runs
+DEFAULT_BATCH_WAIT_SECONDS = float(os.getenv("EA_PROMPT_BATCH_WAIT_SECONDS", "0.2"))
+# Prompts merged into one LLM request at most
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("EA_PROMPT_BATCH_MAX_SIZE", "16"))
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class BatchedItem(BaseModel):
+    id: str
+    output: str
+
+
+class BatchedOutputs(BaseModel):
+    """Structured answer expected from a merged request, one entry per item"""
+    items: List[BatchedItem]
+
+
+@dataclass
+class _PendingPrompt:
+    item_id: str
+    prompt: str
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class _Batch:
+    agent: 'BaseAgent'
+    task_name: str
+    prompts: List[_PendingPrompt] = field(default_factory=list)
+    closed: bool = False
+
+
+def system_prompt(agent: 'BaseAgent') -> str:
+    return f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"
+
+
+def item_prompt(task: 'Task', context: Optional[str]) -> str:
+    """The task as the agent would see it, for one run"""
+    prompt = task.prompt()
+    if context:
+        prompt += f"\n\nThis is the context you're working with:\n{context}"
+    return prompt
+
+
+def batched_request(item_prompts: List[_PendingPrompt]) -> str:
+    """User message asking for every item's answer in a single JSON reply"""
+    sections = "\n\n".join(f"## Item {pending.item_id}\n{pending.prompt}" for pending in item_prompts)
+    return (
+        f"Complete the task below separately for each of the {len(item_prompts)} items. "
+        "The items are independent projects: never carry information from one item into another.\n\n"
+        'Reply with only a JSON object of the form {"items": [{"id": "<item id>", "output": "<your complete answer>"}]} '
+        "with exactly one entry per item, using the item ids given in the headings.\n\n"
+        f"{sections}"
+    )
+
+
+def parse_batched_reply(reply: str) -> Dict[str, str]:
+    """Map item id to answer, or raise ValueError when the reply is not the expected JSON"""
+    try:
+        outputs = BatchedOutputs.model_validate(json.loads(_CODE_FENCE.sub("", reply.strip())))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Batched reply is not valid JSON output: {str(e)}") from e
+    return {item.id: item.output.strip() for item in outputs.items}
+
+
+class PromptBatcher:
+    """Merges the same task from concurrent crew runs into a single LLM request.
+
+    The first run to reach a task opens a batch and waits up to ``max_wait_seconds``
+    for other runs to add their prompt for the same task and agent. One request then
+    asks the agent's LLM for a JSON list of answers, which is split back per run.
+
+    ``execute`` returns None whenever a run should fall back to a regular agent
+    execution: a batch of one, a failed request, or an item missing from the reply.
+    """
+
+    def __init__(self, max_wait_seconds: float = DEFAULT_BATCH_WAIT_SECONDS, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_wait_seconds = max_wait_seconds
+        self.max_batch_size = max_batch_size
+        # Number of merged LLM requests and of prompts they answered
+        self.requests = 0
+        self.prompts = 0
+        self._open: Dict[str, _Batch] = {}
+        self._counter = 0
+        self._condition = threading.Condition()
+
+    def execute(self, task: 'Task', agent: 'BaseAgent', context: Optional[str]) -> Optional[str]:
+        """Answer ``task`` for one run as part of a batch, or return None to run it normally."""
+        key = hashlib.sha256(f"{task.name}\n{system_prompt(agent)}".encode()).hexdigest()
+        with self._condition:
+            self._counter += 1
+            pending = _PendingPrompt(item_id=str(self._counter), prompt=item_prompt(task, context))
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch(agent=agent, task_name=task.name or "task")
+            batch.prompts.append(pending)
+            if len(batch.prompts) >= self.max_batch_size:
+                self._close(key, batch)
+
+        if leader:
+            with self._condition:
+                self._condition.wait_for(lambda: batch.closed, timeout=self.max_wait_seconds)
+                if not batch.closed:
+                    self._close(key, batch)
+            self._dispatch(batch)
+        return pending.future.result()
+
+    def _close(self, key: str, batch: _Batch) -> None:
+        batch.closed = True
+        del self._open[key]
+        self._condition.notify_all()
+
+    def _dispatch(self, batch: _Batch) -> None:
+        if len(batch.prompts) == 1:
+            batch.prompts[0].future.set_result(None)
+            return
+
+        answers: Dict[str, str] = {}
+        try:
+            reply = batch.agent.llm.call([
+                {"role": "system", "content": system_prompt(batch.agent)},
+                {"role": "user", "content": batched_request(batch.prompts)},
+            ])
+            answers = parse_batched_reply(str(reply))
+            with self._condition:
+                self.requests += 1
+                self.prompts += len(answers)
+            logger.info(f"Answered {len(answers)}/{len(batch.prompts)} {batch.task_name} prompts with one LLM request")
+        except Exception as e:
+            logger.warning(f"Batched request for {batch.task_name} failed, running items individually: {str(e)}")
+        finally:
+            for pending in batch.prompts:
+                pending.future.set_result(answers.get(pending.item_id) or None)
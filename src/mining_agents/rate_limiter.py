@@ -0,0 +1,215 @@
+import os
+import time
+import heapq
+import random
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from crewai.llms.base_llm import BaseLLM
+
+from mining_agents.llm_errors import is_rate_limit_error, retry_after
+from mining_agents.metrics import LLM_RATE_LIMITED, RATE_LIMIT_WAIT
+from mining_agents.settings import env_flag, process_singleton
+
+logger = logging.getLogger(__name__)
+
+# Throttle every agent's LLM calls through one process-wide RateLimiter
+RATE_LIMIT_ENABLED = env_flag("EA_LLM_RATE_LIMIT_ENABLED", True)
+# Provider quotas; 0 leaves that dimension unlimited until the provider answers 429
+REQUESTS_PER_MINUTE = float(os.getenv("EA_LLM_REQUESTS_PER_MINUTE", "0"))
+TOKENS_PER_MINUTE = float(os.getenv("EA_LLM_TOKENS_PER_MINUTE", "0"))
+# Seconds of quota that may be spent in one burst
+BURST_SECONDS = float(os.getenv("EA_LLM_BURST_SECONDS", "10"))
+# Completion tokens assumed per call until the answer's length is known
+COMPLETION_TOKEN_ESTIMATE = int(os.getenv("EA_LLM_COMPLETION_TOKEN_ESTIMATE", "500"))
+# Task-level retries after a rate limit error, with full-jitter exponential backoff
+RATE_LIMIT_RETRIES = int(os.getenv("EA_LLM_RATE_LIMIT_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = float(os.getenv("EA_LLM_BACKOFF_BASE_SECONDS", "1"))
+BACKOFF_MAX_SECONDS = float(os.getenv("EA_LLM_BACKOFF_MAX_SECONDS", "30"))
+
+# Adaptive rate: halved on every 429, recovered step by step on successful calls
+MIN_RATE_SCALE = 0.1
+RATE_RECOVERY_STEP = 0.05
+CHARS_PER_TOKEN = 4
+
+
+def backoff_delay(attempt: int, minimum: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the provider's Retry-After"""
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    return max(delay, minimum or 0.0)
+
+
+def estimate_tokens(messages: Union[str, List[Dict[str, Any]]]) -> int:
+    if isinstance(messages, str):
+        return len(messages) // CHARS_PER_TOKEN
+    return sum(len(str(message.get("content", ""))) for message in messages) // CHARS_PER_TOKEN
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` units per second up to ``burst_seconds`` worth of quota"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float, scale: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate * scale)
+        self._updated = now
+
+    def wait_time(self, amount: float, scale: float) -> float:
+        # A request larger than the whole bucket goes through once the bucket is full
+        missing = min(amount, self.capacity) - self.level
+        return 0.0 if missing <= 0 else missing / (self.rate * scale)
+
+
+class RateLimiter:
+    """Process-wide request and token budget for LLM calls, shared by every crew run.
+
+    ``acquire`` blocks until both buckets have room. Waiting calls are served by
+    priority, lowest first; crews pass their kickoff time, so runs that are already
+    partway through finish before newly started ones. A 429 from the provider pauses
+    all calls for its Retry-After and halves the rate, which then recovers gradually
+    as calls succeed. Unconfigured quotas are unlimited, but 429 pauses still apply.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+        burst_seconds: float = BURST_SECONDS,
+    ):
+        self._requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        self.scale = 1.0
+        # Number of 429s reported through ``throttle``
+        self.throttled = 0
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[float, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int, priority: float) -> float:
+        """Block until a call of about ``tokens`` tokens may be sent; returns the seconds waited"""
+        started = time.monotonic()
+        with self._condition:
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._paused_until - now
+                    if delay <= 0 and self._waiters[0] == entry:
+                        delay = self._budget_delay(now, tokens)
+                        if delay <= 0:
+                            self._take(tokens)
+                            break
+                    # Only the first waiter in line needs a timeout; the others are woken when it leaves
+                    self._condition.wait(timeout=delay if delay > 0 else None)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+        waited = time.monotonic() - started
+        RATE_LIMIT_WAIT.observe(waited)
+        return waited
+
+    def complete(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token budget once a call's size is known and let the rate recover"""
+        with self._condition:
+            if self._tokens is not None:
+                self._tokens.level -= actual_tokens - estimated_tokens
+            self.scale = min(1.0, self.scale + RATE_RECOVERY_STEP)
+
+    def throttle(self, pause_seconds: Optional[float] = None) -> None:
+        """Record a 429: pause every call and halve the rate"""
+        pause = pause_seconds if pause_seconds is not None else BACKOFF_BASE_SECONDS
+        with self._condition:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self.scale = max(MIN_RATE_SCALE, self.scale / 2)
+            self._condition.notify_all()
+        LLM_RATE_LIMITED.inc()
+        logger.warning(f"LLM rate limit hit, pausing calls for {pause:.1f}s at {self.scale:.0%} of the configured rate")
+
+    def _budget_delay(self, now: float, tokens: int) -> float:
+        delay = 0.0
+        for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now, self.scale)
+                delay = max(delay, bucket.wait_time(amount, self.scale))
+        return delay
+
+    def _take(self, tokens: int) -> None:
+        if self._requests is not None:
+            self._requests.level -= 1
+        if self._tokens is not None:
+            self._tokens.level -= tokens
+
+
+@process_singleton
+def get_rate_limiter() -> RateLimiter:
+    """The RateLimiter shared by every crew in the process, configured from the environment"""
+    return RateLimiter()
+
+
+class RateLimitedLLM(BaseLLM):
+    """Agent LLM that takes its slot from a RateLimiter before every call.
+
+    Everything else is delegated to the wrapped LLM, which still emits CrewAI's LLM call
+    events. A 429 is reported to the limiter and re-raised for the task to retry.
+    """
+
+    def __init__(self, wrapped: BaseLLM, limiter: RateLimiter, priority: Callable[[], float]):
+        # BaseLLM.__init__ would reset the wrapped LLM's stop words through the property below
+        self.wrapped = wrapped
+        self.limiter = limiter
+        self.priority = priority
+
+    model = property(lambda self: self.wrapped.model)
+    temperature = property(lambda self: getattr(self.wrapped, "temperature", None))
+
+    @property
+    def stop(self) -> Optional[List[str]]:
+        return self.wrapped.stop
+
+    @stop.setter
+    def stop(self, value: Optional[List[str]]) -> None:
+        self.wrapped.stop = value
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes this class does not define
+        if name == "wrapped":
+            raise AttributeError(name)
+        return getattr(self.wrapped, name)
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        prompt_tokens = estimate_tokens(messages)
+        estimated = prompt_tokens + COMPLETION_TOKEN_ESTIMATE
+        self.limiter.acquire(estimated, self.priority())
+        try:
+            response = self.wrapped.call(messages, tools, callbacks, available_functions)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.limiter.throttle(retry_after(e))
+            raise
+        self.limiter.complete(estimated, prompt_tokens + len(str(response)) // CHARS_PER_TOKEN)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return self.wrapped.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.wrapped.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.wrapped.get_context_window_size()
@@ -0,0 +1,60 @@
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from mining_agents.settings import env_flag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).parent / 'config' / 'rules.yaml'
+RULE_ENGINE_ENABLED = env_flag("EA_RULE_ENGINE_ENABLED", True)
+
+
+def _normalize(value: Any) -> str:
+    return ' '.join(str(value).split()).casefold()
+
+
+@dataclass
+class Rule:
+    when: Dict[str, str]
+    output: str
+
+    def matches(self, inputs: Dict[str, Any]) -> bool:
+        return all(
+            key in inputs and _normalize(inputs[key]) == _normalize(expected)
+            for key, expected in self.when.items()
+        )
+
+
+@dataclass
+class RuleSet:
+    """Ordered lookup table for one task: first matching rule wins, then the default."""
+    task_name: str
+    rules: List[Rule] = field(default_factory=list)
+    default: Optional[str] = None
+
+    def evaluate(self, inputs: Dict[str, Any]) -> Optional[str]:
+        """Render the matching rule's output, or None when the LLM agent should handle it"""
+        template = next((rule.output for rule in self.rules if rule.matches(inputs)), self.default)
+        if template is None:
+            return None
+        return template.format_map({key: str(value) for key, value in inputs.items()}).strip()
+
+
+def load_rules(path: Path = DEFAULT_RULES_PATH) -> Dict[str, RuleSet]:
+    """Load rule sets keyed by task name from a YAML rules file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+
+    rule_sets = {}
+    for task_name, task_rules in config.items():
+        rules = [
+            Rule(when={key: str(value) for key, value in rule['when'].items()}, output=rule['output'])
+            for rule in task_rules.get('rules', [])
+        ]
+        rule_sets[task_name] = RuleSet(task_name=task_name, rules=rules, default=task_rules.get('default'))
+        logger.debug(f"Loaded {len(rules)} rules for {task_name}")
+    return rule_sets
@@ -0,0 +1,93 @@
+import os
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+if TYPE_CHECKING:
+    # Only for annotations, so the API can import the response models without loading CrewAI
+    from crewai.tasks.task_output import TaskOutput
+
+from mining_agents.parsing import parse_next_steps, parse_pd_outline
+
+logger = logging.getLogger(__name__)
+
+# Times a task is re-run when its answer does not match its output schema
+STRUCTURED_OUTPUT_RETRIES = int(os.getenv("EA_STRUCTURED_OUTPUT_RETRIES", "2"))
+
+
+def extract_json(content: str) -> str:
+    """The outermost {...} of an answer, dropping code fences or prose around the JSON"""
+    start, end = content.find('{'), content.rfind('}')
+    return content[start:end + 1] if start != -1 and end > start else content
+
+
+def validate_structured_output(model: Type[BaseModel], content: str) -> BaseModel:
+    """Parse an answer into ``model``, raising ValidationError when it does not fit"""
+    return model.model_validate_json(extract_json(content))
+
+
+class NextStep(BaseModel):
+    step: str = Field(description="A clear, specific action")
+    explanation: str = Field(description="Why the action is a priority now, with any timeframes")
+
+
+class PDOutlineSection(BaseModel):
+    title: str = Field(description="Project Description section title, e.g. Project Overview")
+    points: List[str] = Field(min_length=1, description="Key considerations for the section, one per item")
+
+
+class PDOutline(BaseModel):
+    """Structured output of pd_outline_task"""
+    sections: List[PDOutlineSection] = Field(min_length=1)
+
+    def to_response(self) -> Dict[str, str]:
+        """The EAResponse.pd_outline shape: section title to a bulleted list"""
+        return {section.title: '\n'.join(f"- {point}" for point in section.points) for section in self.sections}
+
+    @classmethod
+    def from_markdown(cls, content: str) -> Optional["PDOutline"]:
+        sections = [
+            PDOutlineSection(title=title, points=[line.lstrip('*- ').strip() for line in body.split('\n') if line.strip()])
+            for title, body in parse_pd_outline(content).items()
+            if title and body.strip()
+        ]
+        return cls(sections=sections) if sections else None
+
+
+class NextSteps(BaseModel):
+    """Structured output of next_steps_task"""
+    steps: List[NextStep] = Field(min_length=1)
+
+    def to_response(self) -> List[Dict[str, str]]:
+        """The EAResponse.next_steps shape"""
+        return [step.model_dump() for step in self.steps]
+
+    @classmethod
+    def from_markdown(cls, content: str) -> Optional["NextSteps"]:
+        steps = [NextStep(**step) for step in parse_next_steps(content) if step['step']]
+        return cls(steps=steps) if steps else None
+
+
+def structured_output_guardrail(model: Type[BaseModel]) -> Callable[['TaskOutput'], Tuple[bool, Any]]:
+    """Guardrail that makes CrewAI retry just this task when its output does not fit ``model``.
+
+    An answer that came back as markdown instead of JSON is converted locally when it
+    still parses; only answers that cannot be read either way cost another LLM call.
+    """
+    def guardrail(task_output: 'TaskOutput') -> Tuple[bool, Any]:
+        if isinstance(task_output.pydantic, model):
+            return True, task_output
+        try:
+            task_output.pydantic = validate_structured_output(model, task_output.raw)
+            return True, task_output
+        except ValidationError as e:
+            error = e
+        structured = model.from_markdown(task_output.raw)
+        if structured is not None:
+            logger.info(f"Recovered {model.__name__} for {task_output.name} from a markdown answer")
+            task_output.pydantic = structured
+            return True, task_output
+        logger.warning(f"{task_output.name} output does not match {model.__name__}, retrying the task")
+        return False, f"Answer with only a JSON object matching the {model.__name__} schema: {error}"
+    return guardrail
@@ -0,0 +1,166 @@
+import gc
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+from typing import Dict
+
+from mining_agents.log_config import configure_logging
+from mining_agents.settings import env_flag
+
+# Same setup as the API, so forked workers inherit it instead of configuring their own
+configure_logging(default_level=logging.WARNING, log_file=None)
+logger = logging.getLogger(__name__)
+
+# Address the API listens on
+HOST = os.getenv("EA_HOST", "0.0.0.0")
+PORT = int(os.getenv("EA_PORT", os.getenv("PORT", "8080")))
+# API worker processes; each runs its own job pool of EA_MAX_WORKERS crews
+WEB_CONCURRENCY = int(os.getenv("EA_WEB_CONCURRENCY", os.getenv("WEB_CONCURRENCY", "1")))
+# Import CrewAI and LiteLLM once in the master, before forking the workers
+PRELOAD_ENABLED = env_flag("EA_PRELOAD_ENABLED", True)
+# Seconds workers get to finish their requests after SIGTERM before they are killed
+GRACEFUL_TIMEOUT_SECONDS = float(os.getenv("EA_GRACEFUL_TIMEOUT_SECONDS", "30"))
+# A worker that dies sooner than this after starting is not respawned, to avoid a crash loop
+MIN_WORKER_LIFETIME_SECONDS = 5.0
+
+
+def preload() -> None:
+    """Import the crew stack so forked workers share it instead of importing it again.
+
+    Importing CrewAI and LiteLLM (with its model cost map) takes seconds and tens of MiB
+    per process. Done once here, every worker gets the modules copy-on-write and only has
+    to build its crews. The knowledge index is opened too, as its memory maps are shared
+    across a fork. No crew is built and no client, cache or thread is created, as none of
+    those survive a fork; ``gc.freeze`` keeps the collector from touching, and so
+    copying, the shared objects.
+    """
+    started = time.perf_counter()
+    import mining_agents.factory  # noqa: F401
+    from mining_agents.knowledge import get_knowledge_index
+
+    # Built here if missing, so workers do not race to build it; the mapping is inherited
+    get_knowledge_index()
+    gc.freeze()
+    logger.info(f"Preloaded the crew stack in {time.perf_counter() - started:.2f}s")
+
+
+def bind_socket(host: str = HOST, port: int = PORT) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket) -> None:
+    """Serve the API on the shared listening socket until told to stop"""
+    import uvicorn
+
+    config = uvicorn.Config(
+        "mining_agents.api:app",
+        log_level=logging.getLevelName(logging.getLogger().level).lower(),
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    """Forks ``workers`` API processes onto one listening socket and keeps them running.
+
+    The kernel spreads connections over the workers. A worker that exits unexpectedly is
+    replaced; SIGTERM or SIGINT stops every worker gracefully. The API's SQLite result
+    cache and checkpoint store are opened by each worker and shared through their files,
+    but jobs live in the worker that accepted them.
+    """
+
+    def __init__(self, sock: socket.socket, workers: int = WEB_CONCURRENCY):
+        self.sock = sock
+        self.workers = workers
+        self._children: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+        status = 0
+        while self._children:
+            try:
+                pid, wait_status = os.wait()
+            except ChildProcessError:
+                break
+            started = self._children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            exit_code = os.waitstatus_to_exitcode(wait_status)
+            logger.warning(f"API worker {pid} exited with {exit_code}")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME_SECONDS:
+                logger.error("API worker failed right after starting; shutting down")
+                status = 1
+                self._stop(signal.SIGTERM, None)
+                continue
+            self._spawn()
+        return status
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Workers take their own signals from uvicorn
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.sock)
+            except BaseException:
+                logger.exception("API worker crashed")
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self._children[pid] = time.monotonic()
+        logger.info(f"Started API worker {pid}")
+
+    def _stop(self, signum: int, frame) -> None:
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info(f"Stopping {len(self._children)} API workers")
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Kill whatever is still running once the graceful timeout is over
+        signal.signal(signal.SIGALRM, self._kill)
+        signal.alarm(max(1, int(GRACEFUL_TIMEOUT_SECONDS) + 5))
+
+    def _kill(self, signum: int, frame) -> None:
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+def serve():
+    """
+    Serve the API with EA_WEB_CONCURRENCY preforked worker processes.
+    """
+    sock = bind_socket()
+    logger.info(f"Serving the Mining Agents API on {HOST}:{PORT} with {WEB_CONCURRENCY} workers")
+    if WEB_CONCURRENCY <= 1 or not hasattr(os, "fork"):
+        # Nothing to share: a single worker in this process
+        run_worker(sock)
+        return
+    if PRELOAD_ENABLED:
+        preload()
+    sys.exit(Master(sock, WEB_CONCURRENCY).run())
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,33 @@
+import os
+import functools
+import threading
+from typing import Callable, List, TypeVar
+
+T = TypeVar("T")
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+def env_flag(name: str, default: bool) -> bool:
+    """Boolean setting from the environment: 1, true or yes in any case turn it on"""
+    value = os.getenv(name)
+    return default if value is None else value.lower() in TRUE_VALUES
+
+
+def process_singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """Call ``factory`` once, on first use, and return that object to every later caller.
+
+    Threads that ask while it is being created wait for it. A None result is kept too,
+    so a failed optional setup is not retried on every call.
+    """
+    lock = threading.Lock()
+    created: List[T] = []
+
+    @functools.wraps(factory)
+    def get() -> T:
+        with lock:
+            if not created:
+                created.append(factory())
+            return created[0]
+
+    return get
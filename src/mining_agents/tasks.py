@@ -0,0 +1,317 @@
+import json
+import time
+import hashlib
+import datetime
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai import Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.task_output import TaskOutput
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError
+
+from mining_agents.cache import CACHE_SCHEMA_VERSION
+from mining_agents.dag import ParallelTask
+from mining_agents.knowledge import format_snippets
+from mining_agents.llm_errors import is_rate_limit_error, retry_after
+from mining_agents.rate_limiter import RATE_LIMIT_RETRIES, backoff_delay
+from mining_agents.schemas import validate_structured_output
+
+logger = logging.getLogger(__name__)
+
+
+def agent_fingerprint(agent: BaseAgent) -> Dict[str, Any]:
+    """The parts of an agent's configuration that shape its answers"""
+    llm = getattr(agent, 'llm', None)
+    return {
+        'role': agent.role,
+        'goal': agent.goal,
+        'backstory': agent.backstory,
+        'model': getattr(llm, 'model', None) or str(llm),
+        'temperature': getattr(llm, 'temperature', None),
+        'tools': sorted(tool.name for tool in (agent.tools or [])),
+    }
+
+
+def task_cache_key(task: Task, agent: BaseAgent, context: Optional[str]) -> str:
+    """Key a task run on its rendered prompt, the upstream outputs it depends on and its agent"""
+    payload = {
+        'version': CACHE_SCHEMA_VERSION,
+        'description': task.description,
+        'expected_output': task.expected_output,
+        'context': context or '',
+        'agent': agent_fingerprint(agent),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def join_context(context: Optional[str], excerpts: Optional[str]) -> Optional[str]:
+    """A task's context followed by its knowledge excerpts"""
+    if not excerpts:
+        return context
+    return f"{context}\n\n{excerpts}" if context else excerpts
+
+
+def task_output_payload(task_output: TaskOutput) -> Dict[str, Any]:
+    """JSON-serializable form of a task output, as stored in the task cache and run checkpoints"""
+    return {
+        'raw': task_output.raw,
+        'json_dict': task_output.json_dict,
+        'pydantic': task_output.pydantic.model_dump(mode='json') if task_output.pydantic else None,
+    }
+
+
+class MemoizedTask(ParallelTask):
+    """Task that reuses a cached output when its rendered prompt, context and agent are unchanged.
+
+    Inputs are already interpolated into the description by the time the task runs, so
+    a task whose placeholders did not change, and whose upstream outputs are the same,
+    is served from ``task_cache`` without an LLM call. Outputs of tasks that did run are
+    written back to the cache. With a ``prompt_batcher``, a task that does need the LLM
+    shares a single request with the same task of other runs in flight. A task given its
+    output from a checkpoint with ``resume_from`` completes with it straight away. With a
+    ``knowledge_index``, the best matching excerpts for the task's description are added
+    to its context, and so to its cache key, before it runs. A task whose description
+    already interpolates every parameter it reads sets ``cache_context`` to False, so
+    upstream outputs that only restate other parameters, like the intake summary with
+    the project name, do not keep it from being reused.
+    """
+
+    task_cache: Optional[Any] = Field(
+        default=None,
+        exclude=True,
+        description="ResultCache used to memoize this task's output, or None to always execute.",
+    )
+    prompt_batcher: Optional[Any] = Field(
+        default=None,
+        exclude=True,
+        description="PromptBatcher that merges this task with the same task of concurrent runs, or None.",
+    )
+    knowledge_index: Optional[Any] = Field(
+        default=None,
+        exclude=True,
+        description="KnowledgeIndex searched for reference excerpts added to this task's context, or None.",
+    )
+    cache_context: bool = Field(
+        default=True,
+        exclude=True,
+        description="Whether the upstream task outputs are part of the cache key; knowledge excerpts always are.",
+    )
+    _cache_hit: bool = PrivateAttr(default=False)
+    _batched: bool = PrivateAttr(default=False)
+    _rate_limit_retries: int = PrivateAttr(default=0)
+    _checkpoint: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _resumed: bool = PrivateAttr(default=False)
+    # Set while CrewAI runs the task through its agent. A failed guardrail makes CrewAI call
+    # _execute_core again with the validation error as context; that retry belongs to the
+    # same execution and must not reset its flags or be cached under the error text.
+    _running_agent: bool = PrivateAttr(default=False)
+
+    @property
+    def cache_hit(self) -> bool:
+        """Whether the last execution was served from the task cache"""
+        return self._cache_hit
+
+    @property
+    def batched(self) -> bool:
+        """Whether the last execution was answered by a merged multi-run LLM request"""
+        return self._batched
+
+    @property
+    def rate_limit_retries(self) -> int:
+        """Times the last execution was retried after the LLM provider's rate limit"""
+        return self._rate_limit_retries
+
+    @property
+    def resumed(self) -> bool:
+        """Whether the last execution replayed the output saved in a run checkpoint"""
+        return self._resumed
+
+    def resume_from(self, checkpoint: Optional[Dict[str, Any]]) -> None:
+        """Complete the next execution with this saved output instead of running, or clear it with None"""
+        self._checkpoint = checkpoint
+
+    def _execute_core(
+        self,
+        agent: Optional[BaseAgent],
+        context: Optional[str],
+        tools: Optional[List[Any]],
+    ) -> TaskOutput:
+        if self._running_agent:
+            return super()._execute_core(agent, context, tools)
+        self._cache_hit = False
+        self._batched = False
+        self._rate_limit_retries = 0
+        self._resumed = False
+        agent = agent or self.agent
+        if agent is None:
+            return super()._execute_core(agent, context, tools)
+
+        if self._checkpoint is not None:
+            logger.info(f"Task {self.name} resumed from checkpoint")
+            task_output = self._complete_from_payload(agent, self._checkpoint)
+            self._resumed = True
+            return task_output
+
+        excerpts = self._knowledge_excerpts()
+        cache_key = None
+        if self.task_cache is not None:
+            cache_key = task_cache_key(self, agent, join_context(context if self.cache_context else None, excerpts))
+            cached = self.task_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Task {self.name} served from task cache")
+                return self._complete_from_cache(agent, cached)
+
+        task_output = self._execute_with_agent(agent, join_context(context, excerpts), tools)
+        if cache_key is not None:
+            self.task_cache.set(cache_key, task_output_payload(task_output))
+        return task_output
+
+    def _knowledge_excerpts(self) -> Optional[str]:
+        """The knowledge excerpts that match the task's description, or None"""
+        if self.knowledge_index is None:
+            return None
+        try:
+            snippets = self.knowledge_index.search(self.description)
+        except Exception as e:
+            logger.warning(f"Knowledge search for {self.name} failed: {str(e)}")
+            return None
+        if not snippets:
+            return None
+        logger.debug(f"Task {self.name} gets knowledge from {', '.join(snippet.source for snippet in snippets)}")
+        return format_snippets(snippets)
+
+    def _execute_with_agent(
+        self,
+        agent: BaseAgent,
+        context: Optional[str],
+        tools: Optional[List[Any]],
+    ) -> TaskOutput:
+        """Run the task through its agent, sharing one LLM request with other runs when batching"""
+        if self.prompt_batcher is not None:
+            raw = self.prompt_batcher.execute(self, agent, context)
+            if raw is not None:
+                task_output = self._complete_without_llm(agent, raw)
+                self._batched = True
+                return task_output
+        # A rate limited call fails only this task, which backs off and runs again
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self._running_agent = True
+            try:
+                return super()._execute_core(agent, context, tools)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == RATE_LIMIT_RETRIES:
+                    raise
+                delay = backoff_delay(attempt, retry_after(e))
+                self._rate_limit_retries += 1
+                logger.warning(f"Task {self.name} hit the LLM rate limit, retrying in {delay:.1f}s ({attempt + 1}/{RATE_LIMIT_RETRIES})")
+                time.sleep(delay)
+            finally:
+                self._running_agent = False
+
+    def _export_output(self, result: str) -> Tuple[Optional[BaseModel], Optional[Dict[str, Any]]]:
+        # With a guardrail to retry the task, validate the answer locally instead of letting
+        # CrewAI's converter spend extra LLM calls reformatting it
+        if self.output_pydantic is None or self.guardrail is None:
+            return super()._export_output(result)
+        try:
+            return validate_structured_output(self.output_pydantic, result), None
+        except ValidationError:
+            return None, None
+
+    def _complete_from_cache(self, agent: BaseAgent, cached: Dict[str, Any]) -> TaskOutput:
+        task_output = self._complete_from_payload(agent, cached)
+        self._cache_hit = True
+        return task_output
+
+    def _complete_from_payload(self, agent: BaseAgent, payload: Dict[str, Any]) -> TaskOutput:
+        """Finish the task with an output saved by ``task_output_payload``"""
+        pydantic_output = None
+        if payload.get('pydantic') is not None and self.output_pydantic:
+            pydantic_output = self.output_pydantic.model_validate(payload['pydantic'])
+        return self._complete_without_llm(agent, payload['raw'], payload.get('json_dict'), pydantic_output)
+
+    def _complete_without_llm(
+        self,
+        agent: BaseAgent,
+        raw: str,
+        json_output: Optional[Dict[str, Any]] = None,
+        pydantic_output: Optional[BaseModel] = None,
+    ) -> TaskOutput:
+        """Finish the task with a result computed in-process, mirroring what Task does after an LLM run"""
+        self.agent = agent
+        self.start_time = datetime.datetime.now()
+        task_output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=raw,
+            pydantic=pydantic_output,
+            json_dict=json_output,
+            agent=agent.role,
+            output_format=self._get_output_format(),
+        )
+        self.output = task_output
+        self.end_time = datetime.datetime.now()
+
+        if self.callback:
+            self.callback(task_output)
+
+        if self.output_file:
+            content = (
+                json_output
+                if json_output
+                else (pydantic_output.model_dump_json() if pydantic_output else raw)
+            )
+            self._save_file(content)
+        return task_output
+
+
+class RuleTask(MemoizedTask):
+    """Task answered by a deterministic RuleSet, falling back to its LLM agent when no rule matches.
+
+    The raw project parameters are captured when CrewAI interpolates them into the task,
+    and evaluated against ``rule_set`` before any LLM call is made. Knowledge excerpts are
+    only searched for on the LLM fallback, as a rule's answer does not use them.
+    """
+
+    rule_set: Optional[Any] = Field(
+        default=None,
+        exclude=True,
+        description="RuleSet evaluated against the kickoff inputs, or None to always use the agent.",
+    )
+    _inputs: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _rule_hit: bool = PrivateAttr(default=False)
+
+    @property
+    def rule_hit(self) -> bool:
+        """Whether the last execution was answered by the rule engine"""
+        return self._rule_hit
+
+    def interpolate_inputs_and_add_conversation_history(self, inputs: Dict[str, Any]) -> None:
+        self._inputs = dict(inputs or {})
+        super().interpolate_inputs_and_add_conversation_history(inputs)
+
+    def _execute_core(
+        self,
+        agent: Optional[BaseAgent],
+        context: Optional[str],
+        tools: Optional[List[Any]],
+    ) -> TaskOutput:
+        if self._running_agent:
+            return super()._execute_core(agent, context, tools)
+        self._rule_hit = False
+        self._cache_hit = False
+        self._batched = False
+        self._rate_limit_retries = 0
+        self._resumed = False
+        agent = agent or self.agent
+        raw = self.rule_set.evaluate(self._inputs) if self.rule_set is not None and agent is not None else None
+        if raw is None:
+            logger.debug(f"No rule matched for {self.name}, falling back to the agent")
+            return super()._execute_core(agent, context, tools)
+
+        logger.info(f"Task {self.name} answered by the rule engine")
+        task_output = self._complete_without_llm(agent, raw)
+        self._rule_hit = True
+        return task_output
@@ -0,0 +1,49 @@
+import os
+
+# Settings are read when the modules are imported, so they are fixed before any test
+# imports mining_agents: every scoping runs the crew, offline and without telemetry
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ["EA_CACHE_ENABLED"] = "false"
+os.environ["EA_TASK_CACHE_ENABLED"] = "false"
+os.environ["EA_KNOWLEDGE_ENABLED"] = "false"
+# Tests that checkpoint use the checkpoint_store fixture, never ./output
+os.environ["EA_CHECKPOINTS_ENABLED"] = "false"
+
+import pytest
+
+from mining_agents.checkpoints import CheckpointStore
+
+
+@pytest.fixture
+def checkpoint_store(tmp_path, monkeypatch):
+    """A scratch checkpoint store in place of the process-wide one"""
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr("mining_agents.crew.get_checkpoint_store", lambda: store)
+    monkeypatch.setattr("mining_agents.main.get_checkpoint_store", lambda: store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Answer every agent's LLM calls with StubLLM, with no latency.
+
+    The agents are swapped as ``MiningAgents.crew()`` builds the crew, so code under test
+    keeps its own call order. Yields the MiningAgents instances built so far.
+    """
+    from mining_agents.crew import MiningAgents
+    from stub_llm import StubLLM
+
+    built = []
+    build = MiningAgents.crew
+
+    def crew(self):
+        crew_instance = build(self)
+        for agent in crew_instance.agents:
+            agent.llm = StubLLM(latency=0)
+        built.append(self)
+        return crew_instance
+
+    monkeypatch.setattr(MiningAgents, "crew", crew)
+    StubLLM.calls = 0
+    yield built
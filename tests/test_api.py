@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from mining_agents import api
+from mining_agents.cache import ResultCache
+
+PROJECT = {"project_name": "Test Project", "location_region": "Skeena", "cobalt_type": "Skarn", "scale": "Small"}
+
+
+@pytest.fixture
+def blocked_scoping(monkeypatch):
+    """Replace the crew run with one that waits for the returned event, counting runs"""
+    release = threading.Event()
+    runs = []
+
+    def execute(input_data, on_task_complete=None, prompt_batcher=None, run_id=None):
+        runs.append(input_data.project_name)
+        on_task_complete("project_intake_task", "intake")
+        release.wait(timeout=5)
+        return {"project_parameters": input_data.model_dump()}
+
+    monkeypatch.setattr(api, "_execute_ea_scoping", execute)
+    yield release, runs
+    release.set()
+
+
+def test_identical_requests_in_flight_share_one_run(blocked_scoping):
+    release, runs = blocked_scoping
+    sections = []
+
+    first = api._submit_scoping(api.ProjectInput(**PROJECT), None, "sync")
+    # Normalized inputs identify the run, and a late subscriber gets the finished sections
+    second = api._submit_scoping(
+        api.ProjectInput(**{**PROJECT, "project_name": " Test  Project", "scale": "small"}),
+        None,
+        "stream",
+        on_task_complete=lambda task_name, output: sections.append(task_name),
+    )
+    other = api._submit_scoping(api.ProjectInput(**{**PROJECT, "scale": "Large"}), None, "sync")
+
+    assert second is first
+    assert other is not first
+    assert sections == ["project_intake_task"]
+    release.set()
+    assert first.future.result(timeout=5)["project_parameters"]["project_name"] == "Test Project"
+    other.future.result(timeout=5)
+    assert len(runs) == 2
+
+
+def test_request_after_the_run_finished_starts_a_new_run(blocked_scoping):
+    release, runs = blocked_scoping
+    release.set()
+    first = api._submit_scoping(api.ProjectInput(**PROJECT), None, "sync")
+    first.future.result(timeout=5)
+
+    second = api._submit_scoping(api.ProjectInput(**PROJECT), None, "sync")
+    second.future.result(timeout=5)
+
+    assert second is not first
+    assert runs == ["Test Project", "Test Project"]
+
+
+def test_cache_hit_leaves_out_the_fields_of_the_run_that_was_cached(tmp_path, monkeypatch):
+    def execute(input_data, on_task_complete=None, prompt_batcher=None, run_id=None):
+        return {
+            "project_parameters": input_data.model_dump(),
+            "regulatory_check": "Assessment required",
+            "task_timings": {"regulatory_check_task": 1.5},
+            "task_cache_hits": {"regulatory_check_task": False},
+            "task_resumed": {"regulatory_check_task": False},
+            "timing": {"crew": 1.5, "tasks": {}},
+        }
+
+    monkeypatch.setattr(api, "_execute_ea_scoping", execute)
+    monkeypatch.setattr(api, "result_cache", ResultCache(str(tmp_path / "cache.sqlite3")))
+    client = TestClient(api.app)
+
+    fresh = client.post("/run-ea-scoping", json=PROJECT)
+    hit = client.post("/run-ea-scoping", json=PROJECT)
+    streamed = client.get("/run-ea-scoping/stream", params=PROJECT)
+
+    assert fresh.headers[api.CACHE_HEADER] == "MISS"
+    assert fresh.json()["timing"]["crew"] == 1.5
+    assert hit.headers[api.CACHE_HEADER] == "HIT"
+    assert hit.json()["regulatory_check"] == "Assessment required"
+    assert all(hit.json()[field] is None for field in api.RUN_FIELDS)
+    assert streamed.headers[api.CACHE_HEADER] == "HIT"
+    assert '"timing"' not in streamed.text
+    api.result_cache.close()
@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+from mining_agents import main
+from mining_agents.checkpoints import CheckpointStore
+
+INPUTS = {"project_name": "Test Project", "location_region": "Skeena", "cobalt_type": "Skarn", "scale": "Small"}
+
+
+def test_store_keeps_task_outputs_until_the_run_completes(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    store.start_run("run-1", INPUTS)
+    store.save_task("run-1", "project_intake_task", {"raw": "intake"})
+    # A resumed run keeps the inputs it was first started with
+    store.start_run("run-1", {**INPUTS, "scale": "Large"})
+
+    run = store.get_run("run-1")
+    assert run["inputs"] == INPUTS
+    assert run["tasks"] == ["project_intake_task"]
+    assert not run["completed"]
+    assert store.task_outputs("run-1") == {"project_intake_task": {"raw": "intake"}}
+
+    store.complete_run("run-1")
+    assert store.get_run("run-1")["completed"]
+    assert store.task_outputs("run-1") == {}
+    assert store.get_run("run-2") is None
+    store.close()
+
+
+def test_resume_only_runs_the_tasks_a_failed_run_did_not_finish(tmp_path, monkeypatch, checkpoint_store, stub_llm):
+    from stub_llm import StubLLM
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["mining_agents", "--no-cache"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": "y")
+    answer = StubLLM.answer
+
+    def provider_down_for_next_steps(self, prompt):
+        if '"steps": List[' in prompt:
+            raise RuntimeError("provider down")
+        return answer(self, prompt)
+
+    monkeypatch.setattr(StubLLM, "answer", provider_down_for_next_steps)
+    with pytest.raises(Exception, match="provider down"):
+        main.run()
+    run_id = stub_llm[0].run_id
+    finished = checkpoint_store.get_run(run_id)["tasks"]
+    assert finished and "next_steps_task" not in finished
+
+    monkeypatch.setattr(StubLLM, "answer", answer)
+    main.resume([run_id])
+
+    resumed = stub_llm[1]
+    # Tasks the rule engine answers are answered again, as cheaply as from a checkpoint
+    replayed = {name for name, hit in resumed.task_resumed.items() if hit}
+    assert replayed and replayed == {name for name in finished if not resumed.task_rule_hits.get(name)}
+    assert not resumed.task_resumed["next_steps_task"]
+    assert checkpoint_store.get_run(run_id)["completed"]
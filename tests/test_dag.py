@@ -0,0 +1,71 @@
+import threading
+
+from crewai import Agent, Crew, Process, Task
+
+from mining_agents.dag import ParallelTask, execution_levels, schedule_parallel
+from stub_llm import StubLLM
+
+
+class FailingLLM(StubLLM):
+    def answer(self, prompt: str) -> str:
+        raise RuntimeError("provider down")
+
+
+def make_agent(llm: StubLLM) -> Agent:
+    return Agent(role="Analyst", goal="Answer", backstory="Tests", llm=llm, max_retry_limit=0, verbose=False)
+
+
+def make_task(name: str, agent: Agent, context=None, task_class=ParallelTask) -> Task:
+    return task_class(name=name, description=f"Run {name}", expected_output="Text", agent=agent, context=context)
+
+
+def test_independent_tasks_share_a_level():
+    agent = make_agent(StubLLM(latency=0))
+    intake = make_task("intake", agent)
+    left = make_task("left", agent, context=[intake])
+    right = make_task("right", agent, context=[intake])
+    summary = make_task("summary", agent, context=[left, right])
+
+    levels = execution_levels([intake, left, right, summary])
+    ordered = schedule_parallel([intake, left, right, summary])
+
+    assert [[task.name for task in level] for level in levels] == [["intake"], ["left", "right"], ["summary"]]
+    assert [task.async_execution for task in ordered] == [False, True, True, False]
+
+
+def test_level_with_a_plain_task_runs_sequentially():
+    agent = make_agent(StubLLM(latency=0))
+    intake = make_task("intake", agent)
+    left = make_task("left", agent, context=[intake], task_class=Task)
+    right = make_task("right", agent, context=[intake])
+    summary = make_task("summary", agent, context=[left, right])
+
+    ordered = schedule_parallel([intake, left, right, summary])
+
+    assert not any(task.async_execution for task in ordered)
+
+
+def test_failing_parallel_task_fails_the_crew():
+    agent = make_agent(StubLLM(latency=0))
+    intake = make_task("intake", agent)
+    left = make_task("left", make_agent(FailingLLM(latency=0)), context=[intake])
+    right = make_task("right", agent, context=[intake])
+    summary = make_task("summary", agent, context=[left, right])
+    tasks = schedule_parallel([intake, left, right, summary])
+    crew = Crew(agents=[task.agent for task in tasks], tasks=tasks, process=Process.sequential)
+
+    errors = []
+
+    def kickoff():
+        try:
+            crew.kickoff()
+        except Exception as e:
+            errors.append(e)
+
+    # A daemon thread, as without ParallelTask the summary task waits for the failed one forever
+    thread = threading.Thread(target=kickoff, daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+
+    assert not thread.is_alive()
+    assert [str(error) for error in errors] == ["provider down"]
@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from mining_agents.jobs import JobManager, JobRunningError, JobStatus, QueueFullError
+
+
+@pytest.fixture
+def job_manager():
+    manager = JobManager(max_workers=1, max_queue=1)
+    yield manager
+    manager.shutdown(wait=True)
+
+
+def test_submit_beyond_capacity_raises_queue_full(job_manager):
+    release = threading.Event()
+    running = job_manager.submit(release.wait)
+    queued = job_manager.submit(release.wait)
+
+    with pytest.raises(QueueFullError):
+        job_manager.submit(release.wait)
+
+    release.set()
+    running.future.result(timeout=5)
+    queued.future.result(timeout=5)
+    # Finished jobs free their slots
+    assert job_manager.submit(lambda: "done").future.result(timeout=5) == "done"
+
+
+def test_job_id_is_only_reused_once_the_job_finished(job_manager):
+    release = threading.Event()
+    first = job_manager.submit(release.wait, job_id="run-1")
+
+    with pytest.raises(JobRunningError):
+        job_manager.submit(release.wait, job_id="run-1")
+
+    release.set()
+    first.future.result(timeout=5)
+    second = job_manager.submit(lambda: "again", job_id="run-1")
+    assert second.future.result(timeout=5) == "again"
+    assert job_manager.get("run-1") is second
+    assert first.status == JobStatus.COMPLETED
+
+
+def test_failed_job_keeps_its_error(job_manager):
+    def fail():
+        raise ValueError("crew failed")
+
+    job = job_manager.submit(fail)
+
+    with pytest.raises(ValueError):
+        job.future.result(timeout=5)
+    assert job.status == JobStatus.FAILED
+    assert job.error == "crew failed"
+    assert job_manager.in_flight == 0
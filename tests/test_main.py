@@ -0,0 +1,19 @@
+import sys
+
+from mining_agents import main
+
+
+def test_interactive_run_checkpoints_its_own_crew(tmp_path, monkeypatch, checkpoint_store, stub_llm):
+    # run() builds its own crew rather than taking one from the pool, so the run state
+    # has to be reset after the tasks exist
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["mining_agents", "--no-cache"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": "y")
+
+    main.run()
+
+    [mining_agents] = stub_llm
+    run = checkpoint_store.get_run(mining_agents.run_id)
+    assert run["completed"]
+    assert run["inputs"] == main.load_mock_data()
+    assert (tmp_path / "output" / "next_steps.json").exists()
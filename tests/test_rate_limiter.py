@@ -0,0 +1,44 @@
+import threading
+import time
+
+from mining_agents.rate_limiter import RateLimiter
+
+
+def test_requests_beyond_the_burst_wait_for_the_bucket_to_refill():
+    # 10 requests a second, with room for a single one at a time
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+
+    assert limiter.acquire(tokens=0, priority=0) < 0.05
+    assert limiter.acquire(tokens=0, priority=0) >= 0.08
+
+
+def test_throttle_pauses_calls_and_halves_the_rate():
+    limiter = RateLimiter()
+
+    limiter.throttle(0.2)
+
+    assert limiter.throttled == 1
+    assert limiter.scale == 0.5
+    assert limiter.acquire(tokens=0, priority=0) >= 0.15
+
+
+def test_waiting_calls_are_served_lowest_priority_first():
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)
+    # Hold every call back until all of them are waiting
+    limiter.throttle(0.3)
+    served = []
+
+    def call(priority):
+        limiter.acquire(tokens=0, priority=priority)
+        served.append(priority)
+
+    threads = [threading.Thread(target=call, args=(priority,)) for priority in (3.0, 1.0, 2.0)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(limiter._waiters) < len(threads) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert served == [1.0, 2.0, 3.0]